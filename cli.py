@@ -1,12 +1,28 @@
 import asyncio
 import logging
+import time
 from functools import wraps
 
 import typer
 
 from contexts import AppContexts
-from src.io import write_summary_to_db
+from settings import get_settings
+from src.backfill import BackfillReport, run_summary_backfill
+from src.io import (
+    get_extraction_db_data_and_validate,
+    get_formatted_summary_batch,
+    read_pdf_from_uri,
+    write_summary_text_batch_to_db,
+    write_summary_to_db,
+)
+from src.module import generate_court_decision_summary
+from src.routing import (
+    compare_summary_sections,
+    full_pipeline_router,
+    keyword_density_router,
+)
 from src.summarization import extract_and_reformat_summary, sanitize_markdown_symbol
+from src.usage import UsageReport
 
 logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
 
@@ -47,5 +63,121 @@ async def summarization_cli(extraction_id: str):
     )
 
 
+@app.command()
+@coro
+async def resanitize_summary_cli(batch_size: int = 500):
+    contexts = await CONTEXTS.get_app_contexts(init_nats=False)
+
+    last_case_id = None
+    while True:
+        cases = await get_formatted_summary_batch(
+            case_db_engine=contexts.case_db_engine,
+            batch_size=batch_size,
+            last_case_id=last_case_id,
+        )
+        if not cases:
+            break
+
+        summary_texts = {
+            case.id: (
+                sanitize_markdown_symbol(case.summary_formatted)
+                if case.summary_formatted is not None
+                else case.summary,
+                sanitize_markdown_symbol(case.summary_formatted_en)
+                if case.summary_formatted_en is not None
+                else case.summary_en,
+            )
+            for case in cases
+        }
+        await write_summary_text_batch_to_db(
+            case_db_engine=contexts.case_db_engine, summary_texts=summary_texts
+        )
+        last_case_id = cases[-1].id
+
+
+@app.command()
+@coro
+async def routing_eval_cli(extraction_id: str):
+    contexts = await CONTEXTS.get_app_contexts(init_nats=False)
+    settings = get_settings()
+
+    crawler_meta, case_meta = await get_extraction_db_data_and_validate(
+        extraction_id=extraction_id,
+        crawler_db_engine=contexts.crawler_db_engine,
+        case_db_engine=contexts.case_db_engine,
+    )
+    doc_content, max_page = await read_pdf_from_uri(crawler_meta.artifact_link)
+
+    start_time = time.perf_counter()
+    baseline_usage = UsageReport(decision_number=case_meta.decision_number)
+    baseline_sections, baseline_report = await generate_court_decision_summary(
+        decision_number=case_meta.decision_number,
+        doc_content=doc_content,
+        max_page=max_page,
+        router=full_pipeline_router(model=settings.summarization_model),
+        usage_report=baseline_usage,
+    )
+    baseline_usage.wall_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    routed_usage = UsageReport(decision_number=case_meta.decision_number)
+    routed_sections, routed_report = await generate_court_decision_summary(
+        decision_number=case_meta.decision_number,
+        doc_content=doc_content,
+        max_page=max_page,
+        router=keyword_density_router(
+            model=settings.summarization_model,
+            light_model=settings.summarization_light_model,
+            full_model_min_density=settings.summarization_full_model_min_density,
+            light_model_min_density=settings.summarization_light_model_min_density,
+        ),
+        usage_report=routed_usage,
+    )
+    routed_usage.wall_time = time.perf_counter() - start_time
+
+    print(f"baseline {baseline_report}")
+    print(f"baseline {baseline_usage}")
+    print(f"routed {routed_report}")
+    print(f"routed {routed_usage}")
+    for key, ratio in compare_summary_sections(
+        baseline_sections, routed_sections
+    ).items():
+        print(f"{key} similarity with baseline: {ratio:.3f}")
+
+
+@app.command()
+@coro
+async def backfill_cli(
+    extraction_ids_path: str,
+    failed_extraction_ids_path: str = "failed_extraction_ids.txt",
+):
+    contexts = await CONTEXTS.get_app_contexts(init_nats=False)
+
+    with open(extraction_ids_path) as extraction_ids_file:
+        extraction_ids = [line.strip() for line in extraction_ids_file if line.strip()]
+
+    report = BackfillReport(extraction_ids=extraction_ids)
+    try:
+        await run_summary_backfill(
+            extraction_ids=extraction_ids,
+            crawler_db_engine=contexts.crawler_db_engine,
+            case_db_engine=contexts.case_db_engine,
+            report=report,
+        )
+    except Exception as e:
+        logging.error(f"backfill stopped early: error - {e}")
+    finally:
+        # written in the input format, so the failed documents can be backfilled
+        # again by passing this file as the extraction ids path
+        with open(failed_extraction_ids_path, "w") as failed_extraction_ids_file:
+            failed_extraction_ids_file.writelines(
+                f"{extraction_id}\n" for extraction_id in report.failed_extraction_ids
+            )
+        print(
+            f"written {len(report.failed_extraction_ids)} failed extraction ids to "
+            f"{failed_extraction_ids_path}"
+        )
+
+
 if __name__ == "__main__":
     app()
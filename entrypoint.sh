@@ -1,2 +1,2 @@
 #!/bin/sh
-uv run uvicorn main:app --port ${SERVICE_PORT} --host 0.0.0.0
\ No newline at end of file
+exec uv run uvicorn main:app --port ${SERVICE_PORT} --host 0.0.0.0
\ No newline at end of file
@@ -9,6 +9,7 @@ from typing import Annotated
 
 from fastapi import Depends, FastAPI
 from fastapi.exceptions import HTTPException
+from fastapi.responses import FileResponse
 from nats.aio.client import Client as NATS
 from nats.aio.msg import Msg
 from pydantic import BaseModel
@@ -29,6 +30,7 @@ from nats_consumer import (
 )
 from settings import get_settings
 from src.io import write_summary_to_db
+from src.profiling import JobProfiler, ProfilingMode
 from src.summarization import extract_and_reformat_summary, sanitize_markdown_symbol
 
 
@@ -36,7 +38,13 @@ class SummarizationRequest(BaseModel):
     extraction_id: str
 
 
+class ProfilingRequest(BaseModel):
+    num_of_jobs: int = 1
+    modes: list[ProfilingMode] = list(ProfilingMode)
+
+
 CONTEXTS = AppContexts()
+PROFILER = JobProfiler(output_dir=get_settings().profiling__output_dir)
 
 
 @asynccontextmanager
@@ -44,26 +52,36 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     global CONTEXTS
     # startup event
     nats_consumer_job_connection = []
+    shutdown_event = asyncio.Event()
     contexts = await CONTEXTS.get_app_contexts()
 
+    if get_settings().profiling__num_of_jobs > 0:
+        PROFILER.arm(
+            num_of_jobs=get_settings().profiling__num_of_jobs,
+            modes=list(ProfilingMode),
+        )
+
     num_of_summarizer_consumer_instances = (
         get_settings().nats__num_of_summarizer_consumer_instances
     )
     nats_consumer_job_connection.extend(
         create_job_consumer_async_task(
-            nats_client=contexts.nats_client,
             jetstream_client=contexts.jetstream_client,
             consumer_config=CONSUMER_CONFIG,
             processing_func=generate_summary,
+            shutdown_event=shutdown_event,
             num_of_consumer_instances=num_of_summarizer_consumer_instances,
         )
     )
     yield
 
     # shutdown event
-    for task in nats_consumer_job_connection:
-        close_task = asyncio.create_task(close_nats_connection(task))
-        await close_task
+    await close_nats_connection(
+        nats_client=contexts.nats_client,
+        consumer_tasks=nats_consumer_job_connection,
+        shutdown_event=shutdown_event,
+        timeout=get_settings().nats__graceful_shutdown_timeout,
+    )
 
 
 app = FastAPI(lifespan=lifespan)
@@ -76,31 +94,32 @@ async def generate_summary(msg: Msg) -> None:
     data = json.loads(msg.data.decode())
     print(f"processing summarization: {data}")
 
-    try:
-        (
-            summary,
-            translated_summary,
-            decision_number,
-        ) = await extract_and_reformat_summary(
-            extraction_id=data["extraction_id"],
-            crawler_db_engine=contexts.crawler_db_engine,
-            case_db_engine=contexts.case_db_engine,
-        )
-
-        summary_text = sanitize_markdown_symbol(summary)
-        translated_summary_text = sanitize_markdown_symbol(translated_summary)
-
-        print(f"updating db summary data decision number: {decision_number}")
-        await write_summary_to_db(
-            case_db_engine=contexts.case_db_engine,
-            decision_number=decision_number,
-            summary=summary,
-            summary_text=summary_text,
-            translated_summary=translated_summary,
-            translated_summary_text=translated_summary_text,
-        )
-    except Exception as e:
-        logging.error(f"failed to process summarization {data}: error - {e}")
+    async with PROFILER.profile_job(job_name=str(data.get("extraction_id"))):
+        try:
+            (
+                summary,
+                translated_summary,
+                decision_number,
+            ) = await extract_and_reformat_summary(
+                extraction_id=data["extraction_id"],
+                crawler_db_engine=contexts.crawler_db_engine,
+                case_db_engine=contexts.case_db_engine,
+            )
+
+            summary_text = sanitize_markdown_symbol(summary)
+            translated_summary_text = sanitize_markdown_symbol(translated_summary)
+
+            print(f"updating db summary data decision number: {decision_number}")
+            await write_summary_to_db(
+                case_db_engine=contexts.case_db_engine,
+                decision_number=decision_number,
+                summary=summary,
+                summary_text=summary_text,
+                translated_summary=translated_summary,
+                translated_summary_text=translated_summary_text,
+            )
+        except Exception as e:
+            logging.error(f"failed to process summarization {data}: error - {e}")
 
     sys.stdout.flush()
     await msg.ack()
@@ -136,3 +155,37 @@ async def submit_summarization_job(
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST)
 
     return {"data": "success"}
+
+
+@app.post(
+    "/admin/profiling",
+    summary="Route for profiling the next processed summarization jobs",
+)
+async def start_profiling(payload: ProfilingRequest) -> dict:
+    if payload.num_of_jobs < 1:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST)
+
+    PROFILER.arm(num_of_jobs=payload.num_of_jobs, modes=payload.modes)
+    print(f"profiling next {payload.num_of_jobs} jobs : {payload.modes}")
+
+    return {"data": PROFILER.status()}
+
+
+@app.get(
+    "/admin/profiling",
+    summary="Route for getting the profiling status and artifacts",
+)
+async def get_profiling_status() -> dict:
+    return {"data": PROFILER.status()}
+
+
+@app.get(
+    "/admin/profiling/{artifact_name}",
+    summary="Route for downloading a profile artifact",
+)
+async def download_profiling_artifact(artifact_name: str) -> FileResponse:
+    artifact_path = PROFILER.get_artifact_path(artifact_name)
+    if artifact_path is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+
+    return FileResponse(artifact_path, filename=artifact_name)
@@ -16,8 +16,8 @@ STREAM_SUBJECTS = f"{STREAM_NAME}.>"
 SUBJECT = f"{STREAM_NAME}.summarize"
 DURABLE_NAME = "SUPREME_COURT_SUMMARIZATION"
 DEFAULT_WAIT_TIME_PER_PROCESS = 3600
-DEFAULT_TIMEOUT_INTERVAL = 30
 DEFAULT_WAIT_TIME_FOR_NEXT_FETCH = 1
+DEFAULT_RECONNECT_TIME_WAIT = 2
 PENDING_MSG_LIMIT = 1
 
 CONSUMER_CONFIG = ConsumerConfig(
@@ -41,6 +41,10 @@ async def initialize_nats() -> NATS:
     await nats_client.connect(
         get_settings().nats__url,
         error_cb=error_callback,
+        disconnected_cb=disconnected_callback,
+        reconnected_cb=reconnected_callback,
+        max_reconnect_attempts=-1,
+        reconnect_time_wait=DEFAULT_RECONNECT_TIME_WAIT,
     )
 
     return nats_client
@@ -114,7 +118,9 @@ async def upsert_jetstream_client(
 
 async def error_callback(error: Exception) -> None:
     """
-    An asynchronous callback function that handles errors.
+    An asynchronous callback function that handles errors. It is awaited by the
+    client on every failed reconnect attempt, so it must not wait, the reconnect
+    pace is set by `reconnect_time_wait`.
 
     Args:
         error: The error that occurred.
@@ -123,26 +129,41 @@ async def error_callback(error: Exception) -> None:
         error_msg = f"NATS client got error: {error}"
         logging.warning(error_msg)
 
-        await asyncio.sleep(DEFAULT_TIMEOUT_INTERVAL)
+
+async def disconnected_callback() -> None:
+    """
+    An asynchronous callback function called when the NATS connection is lost, the
+    client keeps reconnecting in the background.
+    """
+    logging.warning("NATS client disconnected, reconnecting..")
+
+
+async def reconnected_callback() -> None:
+    """
+    An asynchronous callback function called when the NATS connection is restored.
+    """
+    logging.warning("NATS client reconnected")
 
 
 def create_job_consumer_async_task(
-    nats_client: NATS,
     jetstream_client: JetStreamContext,
     consumer_config: ConsumerConfig,
     processing_func: Callable,
+    shutdown_event: asyncio.Event,
     num_of_consumer_instances: int = 1,
 ) -> list[asyncio.Task]:
     """
-    Asynchronously creates multiple job consumer tasks.
+    Asynchronously creates multiple job consumer tasks sharing the same
+    JetStream client.
 
     Args:
-        nats_client (NATS): NATS client.
         jetstream_client (JetStreamContext): JetStream context
         consumer_config (ConsumerConfig):
             The configuration for the consumer.
         processing_func (callable):
             The function to be executed for each job.
+        shutdown_event (asyncio.Event):
+            The event which stops the consumers from fetching new jobs.
         num_of_consumer_instances (int):
             The number of consumer instances to create.
 
@@ -155,10 +176,10 @@ def create_job_consumer_async_task(
         nats_consumer_job_connection.append(
             asyncio.create_task(
                 run_job_consumer(
-                    nats_client=nats_client,
                     jetstream_client=jetstream_client,
                     consumer_config=consumer_config,
                     processing_func=processing_func,
+                    shutdown_event=shutdown_event,
                 )
             ),
         )
@@ -167,43 +188,47 @@ def create_job_consumer_async_task(
 
 
 async def run_job_consumer(
-    nats_client: NATS,
     jetstream_client: JetStreamContext,
     consumer_config: ConsumerConfig,
     processing_func: Callable,
+    shutdown_event: asyncio.Event,
     fetch_job_batch_size: int = 1,
     wait_time_for_next_fetch: float = DEFAULT_WAIT_TIME_FOR_NEXT_FETCH,
 ) -> None:
     """
-    Run the index pinvalue comparables job subscriber.
+    Run the summarization job subscriber until the shutdown event is set.
+
+    Reconnection is handled by the shared NATS client, fetches failing meanwhile
+    are retried after a short wait.
 
     Args:
-        context (AppContexts):
-            The context containing necessary information
-                for the job execution.
+        jetstream_client (JetStreamContext):
+            The JetStream client shared by all consumers.
+        consumer_config (ConsumerConfig):
+            The consumer configuration.
+        processing_func (callable):
+            The function to be executed for each job, it acks the job message.
+        shutdown_event (asyncio.Event):
+            The event which stops the consumer from fetching new jobs.
+        fetch_job_batch_size (int):
+            The number of jobs fetched at once.
+        wait_time_for_next_fetch (float):
+            The seconds to wait before fetching again after a failed fetch.
 
     Returns:
         None
     """
     job_consumer = await create_pull_job_consumer(jetstream_client, consumer_config)
 
-    while True:
+    while not shutdown_event.is_set():
         try:
-            if not nats_client.is_connected:
-                nats_client = await initialize_nats()
-
-                stream_configs = generate_nats_stream_configs()
-                jetstream_client = await initialize_jetstream_client(
-                    nats_client=nats_client,
-                    stream_configs=stream_configs,
-                )
-
-                job_consumer = await create_pull_job_consumer(
-                    jetstream_client, consumer_config
-                )
-
             msgs = await job_consumer.fetch(fetch_job_batch_size)
             for msg in msgs:
+                if shutdown_event.is_set():
+                    # hand the job over to another worker right away
+                    await msg.nak()
+                    continue
+
                 await processing_func(msg)
 
         except asyncio.TimeoutError:
@@ -213,6 +238,9 @@ async def run_job_consumer(
             logging.warning(f"Unknown err: {e}")
             await asyncio.sleep(wait_time_for_next_fetch)
 
+    print(f"Stopped {consumer_config.filter_subject} job subscriber..")
+    sys.stdout.flush()
+
 
 async def create_pull_job_consumer(
     jetstream_client: JetStreamContext,
@@ -243,16 +271,50 @@ async def create_pull_job_consumer(
     return job_consumer
 
 
-async def close_nats_connection(connection_task: asyncio.Task) -> None:
+async def close_nats_connection(
+    nats_client: NATS,
+    consumer_tasks: list[asyncio.Task],
+    shutdown_event: asyncio.Event,
+    timeout: float,
+) -> None:
     """
-    Closes a NATS connection.
+    Gracefully stop the job consumers and close the NATS connection.
+
+    The consumers stop fetching new jobs, in-flight jobs are given until the
+    timeout to finish and be acked, then the connection is drained. A connection
+    which is down is closed instead, the unacked jobs are redelivered.
 
     Args:
-        connection_task (asyncio.Task): The task representing the connection.
+        nats_client (NATS): The NATS client shared by the consumers.
+        consumer_tasks (list[asyncio.Task]): The job consumer tasks.
+        shutdown_event (asyncio.Event):
+            The event which stops the consumers from fetching new jobs.
+        timeout (float): The seconds to wait for the in-flight jobs.
 
     Returns:
         None.
     """
-    # Perform connection cleanup here
-    await asyncio.sleep(2)  # Simulating connection cleanup time
-    connection_task.cancel()
+    shutdown_event.set()
+    if consumer_tasks:
+        _, pending_tasks = await asyncio.wait(consumer_tasks, timeout=timeout)
+        for task in pending_tasks:
+            logging.warning("job consumer did not finish in time, cancelling")
+            task.cancel()
+
+        # let the cancelled consumers unwind before their connection goes away
+        await asyncio.gather(*pending_tasks, return_exceptions=True)
+
+    if nats_client is None or nats_client.is_closed:
+        return
+
+    # draining needs the connection, which may never come back during an outage
+    if nats_client.is_connecting or nats_client.is_reconnecting:
+        logging.warning("NATS client is reconnecting, closing without draining")
+        await nats_client.close()
+        return
+
+    try:
+        await nats_client.drain()
+    except Exception as e:
+        logging.warning(f"failed to drain NATS connection, closing: error - {e}")
+        await nats_client.close()
@@ -17,7 +17,27 @@ class Settings(BaseSettings):
     db_pass: str
     nats__url: str
     nats__num_of_summarizer_consumer_instances: int = 3
+    nats__graceful_shutdown_timeout: int = 300
     async_http_request_timeout: int = 300
+    summarization_model: str = "gpt-4o-mini-2024-07-18"
+    summarization_light_model: str | None = None
+    summarization_batch_routing: bool = False
+    summarization_full_model_min_density: float = 2.0
+    summarization_light_model_min_density: float = 0.5
+    preprocessing__enabled: bool = False
+    ocr__num_of_workers: int | None = None
+    ocr__pages_per_range: int = 5
+    ocr__pdf_image_dpi: int = 200
+    ocr__scanned_pdf_image_dpi: int = 300
+    ocr__text_layer_min_chars: int = 100
+    batch__api_base: str | None = None
+    batch__poll_interval: int = 60
+    batch__max_requests_per_batch: int = 50000
+    batch__num_of_concurrent_documents: int = 8
+    batch__max_retries: int = 3
+    batch__max_active_documents: int = 1000
+    profiling__output_dir: str = "/tmp/court-decision-summarizer-profiles"
+    profiling__num_of_jobs: int = 0
 
     model_config = SettingsConfigDict(env_file=".env", extra="allow")
 
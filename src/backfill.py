@@ -0,0 +1,490 @@
+import asyncio
+import json
+import logging
+
+from httpx import AsyncClient
+from litellm.utils import type_to_response_format_param
+from openai import AsyncOpenAI
+from openai.types import Batch
+from pydantic import BaseModel, Field
+from sqlalchemy.engine.base import Engine
+from tenacity import (
+    retry,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from settings import get_settings
+from src.io import (
+    get_extraction_db_data_and_validate,
+    read_pdf_from_uri,
+    write_summary_to_db,
+)
+from src.module import (
+    INITIAL_PAGE_CONTEXT,
+    INITIAL_SUMMARY,
+    SUMMARY_SECTION_TITLES,
+    SUMMARY_SECTION_TITLES_EN,
+    CourtDecisionSummary,
+    build_section_translation_cache,
+    build_summarization_messages,
+    build_translation_messages,
+    format_summary_sections,
+    get_batch_router,
+    route_page_batches,
+    split_cached_translations,
+    split_page_batches,
+)
+from src.routing import BatchRouter, RoutingReport
+from src.summarization import sanitize_markdown_symbol
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BackfillDocument(BaseModel):
+    extraction_id: str
+    decision_number: str
+    page_batches: list[tuple[str, str]]
+    cached_translations: dict[str, str]
+    batch_index: int = 0
+    current_summary: str = INITIAL_SUMMARY
+    previous_page_context: str = INITIAL_PAGE_CONTEXT
+    sections: dict[str, str] = Field(
+        default_factory=lambda: {key: "-" for key in SUMMARY_SECTION_TITLES}
+    )
+    translated_sections: dict[str, str] = {}
+    # unset until every page batch is summarized
+    pending_translation_keys: list[str] | None = None
+    nrof_failed_attempts: int = 0
+    failed: bool = False
+
+    @property
+    def has_pending_page_batch(self) -> bool:
+        return not self.failed and self.batch_index < len(self.page_batches)
+
+    @property
+    def is_translated(self) -> bool:
+        return not self.failed and self.pending_translation_keys == []
+
+    def start_translation(self) -> None:
+        self.translated_sections, self.pending_translation_keys = (
+            split_cached_translations(
+                sections=self.sections, cached_translations=self.cached_translations
+            )
+        )
+
+    def record_failed_attempt(self, max_retries: int) -> None:
+        self.nrof_failed_attempts += 1
+        if self.nrof_failed_attempts > max_retries:
+            self.failed = True
+
+
+class BackfillReport(BaseModel):
+    extraction_ids: list[str]
+    succeeded_extraction_ids: list[str] = []
+
+    @property
+    def failed_extraction_ids(self) -> list[str]:
+        # the documents still in progress when the backfill stops count as failed
+        succeeded_extraction_ids = set(self.succeeded_extraction_ids)
+        return [
+            extraction_id
+            for extraction_id in self.extraction_ids
+            if extraction_id not in succeeded_extraction_ids
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"backfill report: {len(self.succeeded_extraction_ids)} documents "
+            f"backfilled, {len(self.failed_extraction_ids)} failed"
+        )
+
+
+class BatchClient:
+    """
+    Submit chat completion requests through the batch API and wait for their
+    results. The API base and HTTP client are configurable so a local stand-in
+    batch server can be used instead of OpenAI.
+    """
+
+    def __init__(self, http_client: AsyncClient | None = None):
+        settings = get_settings()
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.batch__api_base,
+            http_client=http_client,
+        )
+        self.poll_interval = settings.batch__poll_interval
+        self.max_requests_per_batch = settings.batch__max_requests_per_batch
+
+    @retry(
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        stop=stop_after_attempt(5),
+        reraise=True,
+    )
+    async def submit(self, requests: list[dict]) -> str:
+        content = "\n".join(json.dumps(request) for request in requests).encode()
+        batch_file = await self.client.files.create(
+            file=("batch.jsonl", content), purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        print(f"submitted batch {batch.id} with {len(requests)} requests")
+
+        return batch.id
+
+    @retry(
+        wait=wait_exponential(multiplier=1, min=2, max=60),
+        stop=stop_after_attempt(5),
+        reraise=True,
+    )
+    async def retrieve_batch(self, batch_id: str) -> Batch:
+        return await self.client.batches.retrieve(batch_id)
+
+    @retry(
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        stop=stop_after_attempt(5),
+        reraise=True,
+    )
+    async def read_file(self, file_id: str) -> str:
+        response = await self.client.files.content(file_id)
+        return response.text
+
+    async def wait_for_results(self, batch_id: str) -> dict[str, str]:
+        """
+        Poll the batch until it is finished and read its successful results.
+
+        Args:
+            batch_id (str): The batch identifier.
+
+        Returns:
+            dict[str, str]: The response message content keyed by the custom id.
+        """
+        batch = await self.retrieve_batch(batch_id)
+        while batch.status not in BATCH_FINAL_STATUSES:
+            await asyncio.sleep(self.poll_interval)
+            batch = await self.retrieve_batch(batch_id)
+
+        print(f"batch {batch_id} finished with status {batch.status}")
+        if batch.error_file_id:
+            logging.warning(f"batch {batch_id} has failed requests")
+
+        results = {}
+        if not batch.output_file_id:
+            return results
+
+        output = await self.read_file(batch.output_file_id)
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+
+            results[item["custom_id"]] = response["body"]["choices"][0]["message"][
+                "content"
+            ]
+
+        return results
+
+    async def run(self, requests: list[dict]) -> dict[str, str]:
+        """
+        Run the requests in as few batches as the batch size limit allows.
+
+        Args:
+            requests (list[dict]): The batch API request lines.
+
+        Returns:
+            dict[str, str]: The response message content keyed by the custom id.
+        """
+        if not requests:
+            return {}
+
+        batch_ids = await asyncio.gather(
+            *[
+                self.submit(requests[start : start + self.max_requests_per_batch])
+                for start in range(0, len(requests), self.max_requests_per_batch)
+            ]
+        )
+        batch_results = await asyncio.gather(
+            *[self.wait_for_results(batch_id) for batch_id in batch_ids]
+        )
+
+        return {
+            custom_id: content
+            for results in batch_results
+            for custom_id, content in results.items()
+        }
+
+
+def build_batch_request(
+    custom_id: str, model: str, messages: list[dict], response_format=None
+) -> dict:
+    body = {"model": model, "messages": messages}
+    if response_format is not None:
+        body["response_format"] = type_to_response_format_param(response_format)
+
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": body,
+    }
+
+
+async def load_backfill_document(
+    extraction_id: str,
+    crawler_db_engine: Engine,
+    case_db_engine: Engine,
+    router: BatchRouter,
+) -> BackfillDocument:
+    crawler_meta, case_meta = await get_extraction_db_data_and_validate(
+        extraction_id=extraction_id,
+        crawler_db_engine=crawler_db_engine,
+        case_db_engine=case_db_engine,
+    )
+    doc_content, max_page = await read_pdf_from_uri(crawler_meta.artifact_link)
+
+    routing_report = RoutingReport(decision_number=case_meta.decision_number)
+    page_batches = route_page_batches(
+        split_page_batches(doc_content, max_page), router, routing_report
+    )
+    print(routing_report)
+
+    return BackfillDocument(
+        extraction_id=extraction_id,
+        decision_number=case_meta.decision_number,
+        page_batches=page_batches,
+        cached_translations=build_section_translation_cache(
+            summary=case_meta.summary_formatted,
+            translated_summary=case_meta.summary_formatted_en,
+        ),
+    )
+
+
+def build_round_requests(documents: list[BackfillDocument]) -> list[dict]:
+    """
+    Build the requests of a backfill round: the next page batch of the documents
+    still being summarized and the pending sections of the summarized documents.
+
+    Args:
+        documents (list[BackfillDocument]): The active documents.
+
+    Returns:
+        list[dict]: The batch API request lines.
+    """
+    requests = []
+    for document in documents:
+        if document.failed:
+            continue
+
+        if document.has_pending_page_batch:
+            combined_content, model = document.page_batches[document.batch_index]
+            requests.append(
+                build_batch_request(
+                    custom_id=(
+                        f"summary-{document.extraction_id}-{document.batch_index}"
+                    ),
+                    model=model,
+                    messages=build_summarization_messages(
+                        current_summary=document.current_summary,
+                        previous_page_context=document.previous_page_context,
+                        current_page_content=combined_content,
+                    ),
+                    response_format=CourtDecisionSummary,
+                )
+            )
+            continue
+
+        if document.pending_translation_keys is None:
+            document.start_translation()
+
+        requests.extend(
+            build_batch_request(
+                custom_id=f"translation-{document.extraction_id}-{key}",
+                model=get_settings().summarization_model,
+                messages=build_translation_messages(content=document.sections[key]),
+            )
+            for key in document.pending_translation_keys
+        )
+
+    return requests
+
+
+def apply_round_results(
+    documents: list[BackfillDocument], results: dict[str, str]
+) -> None:
+    """
+    Move the documents forward with the results of a backfill round. Documents
+    missing a result are submitted again in the next round until they run out of
+    retries.
+
+    Args:
+        documents (list[BackfillDocument]): The active documents.
+        results (dict[str, str]): The response message content keyed by custom id.
+    """
+    max_retries = get_settings().batch__max_retries
+    for document in documents:
+        if document.failed:
+            continue
+
+        if document.has_pending_page_batch:
+            content = results.get(
+                f"summary-{document.extraction_id}-{document.batch_index}"
+            )
+            try:
+                result = CourtDecisionSummary(**json.loads(content))
+            except Exception as e:
+                logging.error(
+                    f"failed to summarize {document.decision_number} page batch "
+                    f"{document.batch_index}: error - {e}"
+                )
+                document.record_failed_attempt(max_retries)
+                continue
+
+            document.previous_page_context = result.current_page_context
+            document.current_summary = result.improved_summary
+            document.sections = result.sections
+            document.batch_index += 1
+            continue
+
+        for key in document.pending_translation_keys:
+            content = results.get(f"translation-{document.extraction_id}-{key}")
+            if content is not None:
+                document.translated_sections[key] = content
+
+        missing_keys = [
+            key
+            for key in document.pending_translation_keys
+            if key not in document.translated_sections
+        ]
+        if missing_keys:
+            logging.error(
+                f"failed to translate {document.decision_number} sections "
+                f"{missing_keys}"
+            )
+            document.record_failed_attempt(max_retries)
+        document.pending_translation_keys = missing_keys
+
+
+async def write_backfill_document(
+    document: BackfillDocument, case_db_engine: Engine
+) -> bool:
+    summary = format_summary_sections(document.sections, SUMMARY_SECTION_TITLES)
+    translated_summary = format_summary_sections(
+        document.translated_sections, SUMMARY_SECTION_TITLES_EN
+    )
+    try:
+        await write_summary_to_db(
+            case_db_engine=case_db_engine,
+            decision_number=document.decision_number,
+            summary=summary,
+            summary_text=sanitize_markdown_symbol(summary),
+            translated_summary=translated_summary,
+            translated_summary_text=sanitize_markdown_symbol(translated_summary),
+        )
+    except Exception as e:
+        logging.error(f"failed to write {document.decision_number}: error - {e}")
+        return False
+
+    return True
+
+
+async def run_summary_backfill(
+    extraction_ids: list[str],
+    crawler_db_engine: Engine,
+    case_db_engine: Engine,
+    batch_client: BatchClient | None = None,
+    report: BackfillReport | None = None,
+) -> BackfillReport:
+    """
+    Summarize and translate the documents through the batch API, then write the
+    summaries into the database.
+
+    Every round submits a single batch job holding the next page batch of each
+    document being summarized, since a page batch depends on the summary of the
+    previous one, and the sections of the summarized documents. Finished
+    documents are replaced with new ones right away, so long documents do not
+    hold back the others.
+
+    Args:
+        extraction_ids (list[str]): The extraction ids of the documents.
+        crawler_db_engine (Engine): The crawler database engine.
+        case_db_engine (Engine): The case database engine.
+        batch_client (BatchClient | None): The batch API client.
+        report (BackfillReport | None):
+            The report recording the progress, kept up to date so the caller
+            still knows the backfilled documents when the backfill stops early.
+
+    Returns:
+        BackfillReport: The backfilled and failed extraction ids.
+    """
+    settings = get_settings()
+    batch_client = batch_client or BatchClient()
+    router = get_batch_router()
+    semaphore = asyncio.Semaphore(settings.batch__num_of_concurrent_documents)
+    report = report or BackfillReport(extraction_ids=extraction_ids)
+
+    async def load_document(extraction_id: str) -> BackfillDocument | None:
+        async with semaphore:
+            try:
+                return await load_backfill_document(
+                    extraction_id=extraction_id,
+                    crawler_db_engine=crawler_db_engine,
+                    case_db_engine=case_db_engine,
+                    router=router,
+                )
+            except Exception as e:
+                logging.error(f"failed to load {extraction_id}: error - {e}")
+                return None
+
+    # the custom ids are keyed by extraction id, which must be unique in a batch
+    pending_extraction_ids = list(dict.fromkeys(extraction_ids))
+    active_documents = []
+    round_number = 0
+    while pending_extraction_ids or active_documents:
+        nrof_loaded_documents = settings.batch__max_active_documents - len(
+            active_documents
+        )
+        loaded_extraction_ids = pending_extraction_ids[:nrof_loaded_documents]
+        pending_extraction_ids = pending_extraction_ids[nrof_loaded_documents:]
+        loaded_documents = await asyncio.gather(
+            *[load_document(extraction_id) for extraction_id in loaded_extraction_ids]
+        )
+        active_documents.extend(
+            document for document in loaded_documents if document is not None
+        )
+
+        round_number += 1
+        requests = build_round_requests(active_documents)
+        print(
+            f"backfill round {round_number}: {len(active_documents)} documents, "
+            f"{len(requests)} requests"
+        )
+        try:
+            results = await batch_client.run(requests)
+        except Exception as e:
+            # the documents of the round are retried in the next one
+            logging.error(f"failed to run backfill round {round_number}: error - {e}")
+            results = {}
+        apply_round_results(active_documents, results)
+
+        remaining_documents = []
+        for document in active_documents:
+            if document.is_translated:
+                if await write_backfill_document(document, case_db_engine):
+                    report.succeeded_extraction_ids.append(document.extraction_id)
+            elif not document.failed:
+                remaining_documents.append(document)
+        active_documents = remaining_documents
+
+    print(report)
+
+    return report
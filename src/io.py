@@ -1,4 +1,3 @@
-import asyncio
 import tempfile
 
 import aiofiles
@@ -13,10 +12,10 @@ from tenacity import (
     stop_after_attempt,
     wait_exponential,
 )
-from unstructured.documents.elements import Footer, Header
-from unstructured.partition.pdf import partition_pdf
 
 from settings import get_settings
+from src.pdf import partition_pdf_in_page_ranges
+from src.preprocessing import preprocess_pages
 
 
 class Extraction(SQLModel, table=True):
@@ -101,21 +100,19 @@ async def read_pdf_from_uri(uri_path: str) -> tuple[dict[int, str], int]:
             await afp.write(response.content)
             await afp.flush()
 
-        elements = partition_pdf(temp_file.name)
+        elements = await partition_pdf_in_page_ranges(temp_file.name)
 
-    contents = {}
-    for el in elements:
-        if type(el) in [Header, Footer]:
-            continue
-
-        current_page = el.metadata.page_number
-        current_content = contents.get(current_page, "")
-        current_content += "\n" + str(el)
-        contents[current_page] = current_content
-
-        await asyncio.sleep(0.01)
+    page_elements = {}
+    for current_page, text in elements:
+        page_elements.setdefault(current_page, []).append(text)
 
     max_page = current_page
+    contents = {
+        page_number: "\n".join(texts) for page_number, texts in page_elements.items()
+    }
+    if get_settings().preprocessing__enabled:
+        contents, preprocessing_report = preprocess_pages(contents, uri_path=uri_path)
+        print(preprocessing_report)
 
     return contents, max_page
 
@@ -144,3 +141,40 @@ async def write_summary_to_db(
         await session.refresh(case)
 
     print(f"updated summary decision number {decision_number}")
+
+
+async def get_formatted_summary_batch(
+    case_db_engine: Engine, batch_size: int, last_case_id: str | None = None
+) -> list[Cases]:
+    async_case_db_session = sessionmaker(bind=case_db_engine, class_=AsyncSession)
+    query = select(Cases).where(
+        (Cases.summary_formatted.is_not(None))
+        | (Cases.summary_formatted_en.is_not(None))
+    )
+    if last_case_id is not None:
+        query = query.where(Cases.id > last_case_id)
+
+    async with async_case_db_session() as session:
+        result_iterator = await session.execute(
+            query.order_by(Cases.id).limit(batch_size)
+        )
+
+    return [result[0] for result in result_iterator]
+
+
+async def write_summary_text_batch_to_db(
+    case_db_engine: Engine, summary_texts: dict[str, tuple[str | None, str | None]]
+):
+    async_case_db_session = sessionmaker(bind=case_db_engine, class_=AsyncSession)
+    async with async_case_db_session() as session:
+        result_iterator = await session.execute(
+            select(Cases).where(Cases.id.in_(list(summary_texts.keys())))
+        )
+        for result in result_iterator:
+            case = result[0]
+            case.summary, case.summary_en = summary_texts[case.id]
+            session.add(case)
+
+        await session.commit()
+
+    print(f"updated summary text of {len(summary_texts)} cases")
@@ -1,4 +1,6 @@
+import asyncio
 import json
+import time
 
 from litellm import acompletion
 from pydantic import BaseModel, Field
@@ -10,14 +12,22 @@ from tenacity import (
 from tqdm import tqdm
 
 from settings import get_settings
-
-MODEL = "gpt-4o-mini-2024-07-18"
+from src.routing import (
+    BatchRouter,
+    RoutingReport,
+    full_pipeline_router,
+    keyword_density_router,
+)
+from src.usage import LLMCallUsage, UsageReport
 
 SUMMARIZATION_SYSTEM_PROMPT = """
 You are a professional legal expert which can deeply understand the contents and
 contexts of supreme court decision document
 """
 
+# The static instructions come first and the per-call contexts last, so successive
+# calls share an identical prompt prefix. The provider prompt cache only reuses
+# prefixes from 1024 tokens, which this short prefix does not reach on its own
 SUMMARIZATION_PROMPT = """
 # INSTRUCTION
 
@@ -26,6 +36,23 @@ and current page context from extracted supreme court decision PDF document,
 generate your own understanding of the current page context and generate the concise
 and corrected summary with the new important information.
 
+# EXPECTED OUTPUT
+
+- Ensure that any critical important information is not missing
+- Ensure language used is in Bahasa Indonesia
+- ONLY focus on these 4 specific informations:
+    - Defendant details
+    - Prosecutor's demand
+    - Aggravating and mitigating circumstances
+    - Supreme court final verdict ( punishment, penalty, etc..)
+- Think carefully and do not mix prosecutor demand with supreme court final verdict
+- Think step by step to understand the provided contexts and write a summary in the
+style of professional legal expert in formalized Bahasa Indonesia.
+- Write each of the 4 informations into its own summary section, use "-" when the
+information is not found yet
+- Each section MUST be properly structured in markdown format which conform COMMONMARK
+style and MUST NOT contain any markdown heading
+
 # PROVIDED CONTEXTS
 
 ## CURRENT SUMMARY
@@ -43,22 +70,12 @@ This is the current page content of the court decision document from PDF, maybe
 malformed due to PDF extraction noise:
 
 {current_page_content}
-
-# EXPECTED OUTPUT
-
-- Ensure that any critical important information is not missing
-- Ensure language used is in Bahasa Indonesia
-- ONLY focus on these 4 specific informations:
-    - Defendant details
-    - Prosecutor's demand
-    - Aggravating and mitigating circumstances
-    - Supreme court final verdict ( punishment, penalty, etc..)
-- Think carefully and do not mix prosecutor demand with supreme court final verdict
-- Think step by step to understand the provided contexts and write a summary in the
-style of professional legal expert in formalized Bahasa Indonesia.
-- It MUST be properly structured in markdown format which conform COMMONMARK style
 """
 
+INITIAL_SUMMARY = "No summary information yet"
+INITIAL_PAGE_CONTEXT = "No previous page context yet"
+NROF_BATCH_PAGES = 10
+
 TRANSLATION_SYSTEM_PROMPT = """
 You are a professional legal linguistic expert which excel at translating legal decision
 document summary from Bahasa Indonesia into English
@@ -75,10 +92,26 @@ content into English. DO NOT modify the markdown formatting
 """
 
 
+SUMMARY_SECTION_TITLES = {
+    "defendant": "Identitas Terdakwa",
+    "prosecutor_demand": "Tuntutan Penuntut Umum",
+    "aggravating_mitigating": "Keadaan yang Memberatkan dan Meringankan",
+    "verdict": "Putusan Mahkamah Agung",
+}
+
+SUMMARY_SECTION_TITLES_EN = {
+    "defendant": "Defendant Details",
+    "prosecutor_demand": "Prosecutor's Demand",
+    "aggravating_mitigating": "Aggravating and Mitigating Circumstances",
+    "verdict": "Supreme Court Verdict",
+}
+
+
 class CourtDecisionSummary(BaseModel):
     """
-    Summary in the style of professional legal expert in Bahasa Indonesia and
-    properly structured in markdown format which conform COMMONMARK style
+    Summary in the style of professional legal expert in Bahasa Indonesia, split into
+    sections which are properly structured in markdown format which conform
+    COMMONMARK style
     """
 
     current_page_context: str = Field(
@@ -88,55 +121,261 @@ class CourtDecisionSummary(BaseModel):
             "context"
         ),
     )
-    improved_summary: str = Field(
+    defendant: str = Field(
+        ...,
+        description="the improved summary section of the defendant details",
+    )
+    prosecutor_demand: str = Field(
+        ...,
+        description="the improved summary section of the prosecutor's demand",
+    )
+    aggravating_mitigating: str = Field(
+        ...,
+        description=(
+            "the improved summary section of the aggravating and mitigating "
+            "circumstances"
+        ),
+    )
+    verdict: str = Field(
         ...,
         description=(
-            "the final improved supreme court document summary in markdown format"
+            "the improved summary section of the supreme court final verdict "
+            "( punishment, penalty, etc..)"
         ),
     )
 
+    @property
+    def sections(self) -> dict[str, str]:
+        return {key: getattr(self, key) for key in SUMMARY_SECTION_TITLES}
 
-async def generate_court_decision_summary_and_translation(
-    decision_number: str, doc_content: dict[int, str], max_page=int
-) -> tuple[str, str]:
-    current_summary = "No summary information yet"
-    previous_page_context = "No previous page context yet"
-    nrof_batch_pages = 10
-    combined_content = ""
+    @property
+    def improved_summary(self) -> str:
+        return format_summary_sections(self.sections, SUMMARY_SECTION_TITLES)
+
+
+def format_summary_sections(
+    sections: dict[str, str], section_titles: dict[str, str]
+) -> str:
+    """
+    Assemble the summary sections into a single markdown document.
+
+    Args:
+        sections (dict[str, str]): The markdown content of each summary section.
+        section_titles (dict[str, str]): The heading of each summary section.
+
+    Returns:
+        str: The markdown formatted summary.
+    """
+    return "\n\n".join(
+        f"## {title}\n\n{sections.get(key, '').strip()}"
+        for key, title in section_titles.items()
+    )
+
+
+def split_summary_sections(
+    summary: str | None, section_titles: dict[str, str]
+) -> dict[str, str]:
+    """
+    Split a markdown summary assembled by `format_summary_sections` back into its
+    sections, summaries in any other layout yield no section.
+
+    Args:
+        summary (str | None): The markdown formatted summary.
+        section_titles (dict[str, str]): The heading of each summary section.
+
+    Returns:
+        dict[str, str]: The markdown content of each summary section found.
+    """
+    if not summary:
+        return {}
+
+    keys_by_heading = {f"## {title}": key for key, title in section_titles.items()}
+    sections = {}
+    current_key = None
+    current_lines = []
+    for line in summary.split("\n"):
+        if line.strip() in keys_by_heading:
+            if current_key is not None:
+                sections[current_key] = "\n".join(current_lines).strip()
+            current_key = keys_by_heading[line.strip()]
+            current_lines = []
+        elif current_key is not None:
+            current_lines.append(line)
+
+    if current_key is not None:
+        sections[current_key] = "\n".join(current_lines).strip()
+
+    return sections
+
+
+def build_section_translation_cache(
+    summary: str | None, translated_summary: str | None
+) -> dict[str, str]:
+    """
+    Map each previously generated summary section to its stored translation.
+
+    Args:
+        summary (str | None): The previous markdown summary in Bahasa Indonesia.
+        translated_summary (str | None): The previous markdown summary in English.
+
+    Returns:
+        dict[str, str]: The English translation keyed by the section content.
+    """
+    sections = split_summary_sections(summary, SUMMARY_SECTION_TITLES)
+    translated_sections = split_summary_sections(
+        translated_summary, SUMMARY_SECTION_TITLES_EN
+    )
+
+    return {
+        content: translated_sections[key]
+        for key, content in sections.items()
+        if key in translated_sections
+    }
+
+
+def get_batch_router() -> BatchRouter:
+    """
+    Create the page batch router from the settings.
+
+    Returns:
+        BatchRouter: The configured router.
+    """
+    settings = get_settings()
+    if settings.summarization_batch_routing:
+        return keyword_density_router(
+            model=settings.summarization_model,
+            light_model=settings.summarization_light_model,
+            full_model_min_density=settings.summarization_full_model_min_density,
+            light_model_min_density=settings.summarization_light_model_min_density,
+        )
+
+    return full_pipeline_router(model=settings.summarization_model)
+
+
+def split_page_batches(
+    doc_content: dict[int, str], max_page: int, nrof_batch_pages: int = NROF_BATCH_PAGES
+) -> list[str]:
+    """
+    Combine the document pages into the page batches summarized incrementally.
+
+    Args:
+        doc_content (dict[int, str]): The text of each page.
+        max_page (int): The last page number of the document.
+        nrof_batch_pages (int): The page numbers interval of each batch.
+
+    Returns:
+        list[str]: The combined content of each page batch.
+    """
+    page_batches = []
+    batch_contents = []
+    for page_number, content in doc_content.items():
+        batch_contents.append(content)
+
+        if page_number % nrof_batch_pages == 0 or page_number == max_page:
+            page_batches.append("\n".join(batch_contents) + "\n")
+            batch_contents = []
+
+    return page_batches
+
+
+def route_page_batches(
+    page_batches: list[str], router: BatchRouter, routing_report: RoutingReport
+) -> list[tuple[str, str]]:
+    """
+    Pick the model of each page batch, dropping the skipped batches.
+
+    Args:
+        page_batches (list[str]): The combined content of each page batch.
+        router (BatchRouter): The page batch router.
+        routing_report (RoutingReport): The report to record the routing.
+
+    Returns:
+        list[tuple[str, str]]: The content and model of each routed page batch.
+    """
+    routed_page_batches = []
+    for batch_index, combined_content in enumerate(page_batches):
+        model = router(
+            combined_content, batch_index == 0, batch_index == len(page_batches) - 1
+        )
+        routing_report.record(model, full_model=get_settings().summarization_model)
+
+        if model is not None:
+            routed_page_batches.append((combined_content, model))
+
+    return routed_page_batches
+
+
+async def generate_court_decision_summary(
+    decision_number: str,
+    doc_content: dict[int, str],
+    max_page: int,
+    router: BatchRouter,
+    usage_report: UsageReport | None = None,
+) -> tuple[dict[str, str], RoutingReport]:
+    current_summary = INITIAL_SUMMARY
+    current_sections = {key: "-" for key in SUMMARY_SECTION_TITLES}
+    previous_page_context = INITIAL_PAGE_CONTEXT
+    routing_report = RoutingReport(decision_number=decision_number)
+    page_batches = route_page_batches(
+        split_page_batches(doc_content, max_page), router, routing_report
+    )
 
     # Incremental summarization
-    for page_number, content in tqdm(
-        doc_content.items(), desc=f"Iterating pages for {decision_number} summary"
+    for combined_content, model in tqdm(
+        page_batches, desc=f"Iterating page batches for {decision_number} summary"
     ):
-        combined_content += content + "\n"
+        result = await generate_summary(
+            current_page_content=combined_content,
+            previous_page_context=previous_page_context,
+            current_summary=current_summary,
+            model=model,
+            usage_report=usage_report,
+        )
 
-        if page_number % nrof_batch_pages == 0 or page_number == max_page:
-            result = await generate_summary(
-                current_page_content=combined_content,
-                previous_page_context=previous_page_context,
-                current_summary=current_summary,
-            )
+        previous_page_context = result.current_page_context
+        current_summary = result.improved_summary
+        current_sections = result.sections
+
+    return current_sections, routing_report
 
-            previous_page_context = result.current_page_context
-            current_summary = result.improved_summary
-            combined_content = ""
+
+async def generate_court_decision_summary_and_translation(
+    decision_number: str,
+    doc_content: dict[int, str],
+    max_page=int,
+    cached_translations: dict[str, str] | None = None,
+) -> tuple[str, str]:
+    start_time = time.perf_counter()
+    usage_report = UsageReport(decision_number=decision_number)
+    current_sections, routing_report = await generate_court_decision_summary(
+        decision_number=decision_number,
+        doc_content=doc_content,
+        max_page=max_page,
+        router=get_batch_router(),
+        usage_report=usage_report,
+    )
+    print(routing_report)
 
     # Translation
-    final_summary = current_summary
-    translation = await generate_translation(content=final_summary)
+    final_summary = format_summary_sections(current_sections, SUMMARY_SECTION_TITLES)
+    translated_sections = await generate_sections_translation(
+        sections=current_sections,
+        cached_translations=cached_translations or {},
+        usage_report=usage_report,
+    )
+    translation = format_summary_sections(
+        translated_sections, SUMMARY_SECTION_TITLES_EN
+    )
+    usage_report.wall_time = time.perf_counter() - start_time
+    print(usage_report)
 
     return final_summary, translation
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, min=2, max=10),
-    stop=stop_after_attempt(5),
-    reraise=True,
-)
-async def generate_summary(
+def build_summarization_messages(
     current_summary: str, previous_page_context: str, current_page_content: str
-) -> CourtDecisionSummary:
-    messages = [
+) -> list[dict]:
+    return [
         {"role": "system", "content": SUMMARIZATION_SYSTEM_PROMPT},
         {
             "role": "user",
@@ -148,12 +387,51 @@ async def generate_summary(
         },
     ]
 
+
+def build_translation_messages(content: str) -> list[dict]:
+    return [
+        {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": TRANSLATION_PROMPT.format(
+                content=content,
+            ),
+        },
+    ]
+
+
+@retry(
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+async def generate_summary(
+    current_summary: str,
+    previous_page_context: str,
+    current_page_content: str,
+    model: str | None = None,
+    usage_report: UsageReport | None = None,
+) -> CourtDecisionSummary:
+    model = model or get_settings().summarization_model
+    messages = build_summarization_messages(
+        current_summary=current_summary,
+        previous_page_context=previous_page_context,
+        current_page_content=current_page_content,
+    )
+
+    start_time = time.perf_counter()
     response = await acompletion(
-        model=MODEL,
+        model=model,
         messages=messages,
         response_format=CourtDecisionSummary,
         api_key=get_settings().openai_api_key,
     )
+    if usage_report is not None:
+        usage_report.record(
+            LLMCallUsage.from_response(
+                response, model=model, latency=time.perf_counter() - start_time
+            )
+        )
 
     return CourtDecisionSummary(**json.loads(response.choices[0].message.content))
 
@@ -163,21 +441,86 @@ async def generate_summary(
     stop=stop_after_attempt(5),
     reraise=True,
 )
-async def generate_translation(content: str) -> str:
-    messages = [
-        {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
-        {
-            "role": "user",
-            "content": TRANSLATION_PROMPT.format(
-                content=content,
-            ),
-        },
-    ]
+async def generate_translation(
+    content: str, usage_report: UsageReport | None = None
+) -> str:
+    model = get_settings().summarization_model
+    messages = build_translation_messages(content=content)
 
+    start_time = time.perf_counter()
     response = await acompletion(
-        model=MODEL,
+        model=model,
         messages=messages,
         api_key=get_settings().openai_api_key,
     )
+    if usage_report is not None:
+        usage_report.record(
+            LLMCallUsage.from_response(
+                response, model=model, latency=time.perf_counter() - start_time
+            )
+        )
 
     return response.choices[0].message.content
+
+
+async def generate_sections_translation(
+    sections: dict[str, str],
+    cached_translations: dict[str, str],
+    usage_report: UsageReport | None = None,
+) -> dict[str, str]:
+    """
+    Translate the summary sections concurrently, reusing the cached translation of
+    sections which are unchanged from the previous run.
+
+    Args:
+        sections (dict[str, str]): The summary sections in Bahasa Indonesia.
+        cached_translations (dict[str, str]):
+            The English translation keyed by the section content.
+        usage_report (UsageReport | None): The report to record the token usage.
+
+    Returns:
+        dict[str, str]: The summary sections in English.
+    """
+    translated_sections, pending_keys = split_cached_translations(
+        sections=sections, cached_translations=cached_translations
+    )
+    translations = await asyncio.gather(
+        *[
+            generate_translation(content=sections[key], usage_report=usage_report)
+            for key in pending_keys
+        ]
+    )
+    translated_sections.update(zip(pending_keys, translations))
+
+    return translated_sections
+
+
+def split_cached_translations(
+    sections: dict[str, str], cached_translations: dict[str, str]
+) -> tuple[dict[str, str], list[str]]:
+    """
+    Resolve the summary sections translation which need no LLM call, either cached
+    from the previous run or without content.
+
+    Args:
+        sections (dict[str, str]): The summary sections in Bahasa Indonesia.
+        cached_translations (dict[str, str]):
+            The English translation keyed by the section content.
+
+    Returns:
+        tuple[dict[str, str], list[str]]:
+            The resolved sections in English and the keys of the sections which
+            still need to be translated.
+    """
+    translated_sections = {}
+    pending_keys = []
+    for key, content in sections.items():
+        content = content.strip()
+        if content in cached_translations:
+            translated_sections[key] = cached_translations[content]
+        elif content in ("", "-"):
+            translated_sections[key] = content
+        else:
+            pending_keys.append(key)
+
+    return translated_sections, pending_keys
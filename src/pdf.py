@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from enum import Enum
+from functools import lru_cache
+
+from pypdf import PdfReader, PdfWriter
+from unstructured.documents.elements import Footer, Header
+from unstructured.partition.pdf import partition_pdf
+
+from settings import get_settings
+from src.preprocessing import strip_page_noise
+from src.profiling import WORKER_PROFILING, WorkerProfiling, profile_worker
+
+NROF_PROBED_PAGES = 5
+OCR_LANGUAGES = ["ind"]
+
+
+class PartitionStrategy(str, Enum):
+    FAST = "fast"
+    AUTO = "auto"
+    OCR_ONLY = "ocr_only"
+
+
+@lru_cache
+def get_partition_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the process pool shared by the PDF partitioning, workers are spawned once
+    and keep `unstructured` and the OCR models loaded between documents.
+
+    Returns:
+        ProcessPoolExecutor: The process pool.
+    """
+    return ProcessPoolExecutor(
+        max_workers=get_settings().ocr__num_of_workers or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def probe_partition_strategy(pdf_reader: PdfReader) -> PartitionStrategy:
+    """
+    Pick the partition strategy from the text layer of the first pages, scanned
+    documents have no text layer and need OCR. The text stamped on every page of
+    the directory documents, such as the watermark and disclaimer, is stripped
+    first so it does not pass for a text layer.
+
+    Args:
+        pdf_reader (PdfReader): The PDF document reader.
+
+    Returns:
+        PartitionStrategy: The partition strategy for the document.
+    """
+    probed_texts, _ = strip_page_noise(
+        {
+            page_number: page.extract_text() or ""
+            for page_number, page in enumerate(
+                pdf_reader.pages[:NROF_PROBED_PAGES], start=1
+            )
+        }
+    )
+    nrof_text_pages = sum(
+        len(text) >= get_settings().ocr__text_layer_min_chars
+        for text in probed_texts.values()
+    )
+
+    if nrof_text_pages == len(probed_texts):
+        return PartitionStrategy.FAST
+
+    if nrof_text_pages == 0:
+        return PartitionStrategy.OCR_ONLY
+
+    return PartitionStrategy.AUTO
+
+
+def get_pdf_image_dpi(strategy: PartitionStrategy) -> int:
+    """
+    Pick the resolution the pages are rendered at for OCR, scanned documents get a
+    higher resolution since OCR is the only source of their text.
+
+    Args:
+        strategy (PartitionStrategy): The partition strategy of the document.
+
+    Returns:
+        int: The page image DPI.
+    """
+    settings = get_settings()
+    if strategy == PartitionStrategy.OCR_ONLY:
+        return settings.ocr__scanned_pdf_image_dpi
+
+    return settings.ocr__pdf_image_dpi
+
+
+def split_pdf_page_ranges(
+    filename: str, output_dir: str, profiling: WorkerProfiling | None = None
+) -> tuple[PartitionStrategy, list[tuple[str, int]]]:
+    """
+    Probe the partition strategy of a PDF document and split the documents needing
+    OCR into page range files. Blocking, run it in a thread.
+
+    Args:
+        filename (str): The PDF document file.
+        output_dir (str): The directory the page range files are written into.
+        profiling (WorkerProfiling | None): The profiling of the job, if any.
+
+    Returns:
+        tuple[PartitionStrategy, list[tuple[str, int]]]:
+            The partition strategy and the file and starting page number of each
+            page range.
+    """
+    with profile_worker(profiling, "split"):
+        pdf_reader = PdfReader(filename)
+        nrof_pages = len(pdf_reader.pages)
+        strategy = probe_partition_strategy(pdf_reader)
+        print(f"partitioning {nrof_pages} pages PDF with {strategy.value} strategy")
+
+        if strategy == PartitionStrategy.FAST:
+            return strategy, [(filename, 1)]
+
+        pages_per_range = get_settings().ocr__pages_per_range
+        page_ranges = []
+        for range_start in range(0, nrof_pages, pages_per_range):
+            pdf_writer = PdfWriter()
+            for page in pdf_reader.pages[range_start : range_start + pages_per_range]:
+                pdf_writer.add_page(page)
+
+            range_filename = os.path.join(output_dir, f"{range_start}.pdf")
+            with open(range_filename, "wb") as range_file:
+                pdf_writer.write(range_file)
+
+            page_ranges.append((range_filename, range_start + 1))
+
+        return strategy, page_ranges
+
+
+def partition_pdf_page_range(
+    filename: str,
+    starting_page_number: int,
+    strategy: PartitionStrategy,
+    pdf_image_dpi: int,
+    profiling: WorkerProfiling | None = None,
+) -> list[tuple[int, str]]:
+    """
+    Partition a PDF file holding a page range of the document, run in the
+    partition process pool.
+
+    Args:
+        filename (str): The PDF file of the page range.
+        starting_page_number (int): The document page number of the first page.
+        strategy (PartitionStrategy): The partition strategy.
+        pdf_image_dpi (int): The resolution the pages are rendered at for OCR.
+        profiling (WorkerProfiling | None):
+            The profiling of the job, the worker writes its own profile artifacts
+            since the job profile only observes the event loop process.
+
+    Returns:
+        list[tuple[int, str]]:
+            The document page number and text of each element, without the
+            headers and footers.
+    """
+    with profile_worker(profiling, f"partition_pages_{starting_page_number}"):
+        elements = partition_pdf(
+            filename,
+            strategy=strategy.value,
+            starting_page_number=starting_page_number,
+            languages=OCR_LANGUAGES,
+            pdf_image_dpi=pdf_image_dpi,
+        )
+
+    return [
+        (el.metadata.page_number, str(el))
+        for el in elements
+        if type(el) not in [Header, Footer]
+    ]
+
+
+async def partition_pdf_in_page_ranges(filename: str) -> list[tuple[int, str]]:
+    """
+    Partition a PDF document in the process pool. Documents needing OCR are split
+    into page ranges which are partitioned in parallel.
+
+    Args:
+        filename (str): The PDF document file.
+
+    Returns:
+        list[tuple[int, str]]:
+            The page number and text of each element in document order, without
+            the headers and footers.
+    """
+    loop = asyncio.get_running_loop()
+    process_pool = get_partition_process_pool()
+    profiling = WORKER_PROFILING.get()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        strategy, page_ranges = await asyncio.to_thread(
+            split_pdf_page_ranges, filename, temp_dir, profiling
+        )
+        pdf_image_dpi = get_pdf_image_dpi(strategy)
+
+        try:
+            range_elements = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        process_pool,
+                        partition_pdf_page_range,
+                        range_filename,
+                        starting_page_number,
+                        strategy,
+                        pdf_image_dpi,
+                        profiling,
+                    )
+                    for range_filename, starting_page_number in page_ranges
+                )
+            )
+        except BrokenProcessPool:
+            # a crashed worker, e.g. OCR running out of memory, breaks the pool for
+            # good, drop it so the next documents and retries get a new one
+            logging.error("partition process pool is broken, restarting it")
+            if get_partition_process_pool() is process_pool:
+                get_partition_process_pool.cache_clear()
+                get_partition_process_pool()
+            process_pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    return [element for elements in range_elements for element in elements]
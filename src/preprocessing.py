@@ -0,0 +1,151 @@
+import math
+import re
+from collections import Counter
+
+from litellm import token_counter
+from pydantic import BaseModel
+
+from settings import get_settings
+
+WHITESPACE_RE = re.compile(r"[^\S\n]+")
+DIGITS_RE = re.compile(r"\d+")
+PAGE_NUMBER_RE = re.compile(
+    r"^(hal(aman)?\.?\s*)?\d+(\s*(dari|/)\s*\d+)?(\s*hal(aman)?\.?)?$", re.IGNORECASE
+)
+# watermark and disclaimer fragments of the putusan.mahkamahagung.go.id documents
+NOISE_PATTERNS = (
+    re.compile(r"putusan\.mahkamahagung\.go\.id", re.IGNORECASE),
+    re.compile(r"kepaniteraan@mahkamahagung\.go\.id", re.IGNORECASE),
+    re.compile(r"^disclaimer$", re.IGNORECASE),
+    re.compile(r"^direktori putusan mahkamah agung republik indonesia", re.IGNORECASE),
+    re.compile(
+        r"^kepaniteraan mahkamah agung republik indonesia berusaha", re.IGNORECASE
+    ),
+)
+MIN_ALNUM_CHARS = 3
+MIN_ALNUM_RATIO = 0.4
+MIN_PAGES_FOR_REPETITION = 3
+REPEATED_PAGE_RATIO = 0.5
+
+
+class PreprocessingReport(BaseModel):
+    uri_path: str
+    input_tokens_before: int
+    input_tokens_after: int
+    dropped_lines: int
+
+    def __str__(self) -> str:
+        return (
+            f"preprocessing report {self.uri_path}: input tokens "
+            f"{self.input_tokens_before} -> {self.input_tokens_after}, "
+            f"{self.dropped_lines} lines dropped"
+        )
+
+
+def normalize_line(line: str) -> str:
+    return WHITESPACE_RE.sub(" ", line).strip()
+
+
+def is_low_information_line(line: str) -> bool:
+    """
+    Check whether the line is a page number, watermark or OCR garbage fragment.
+
+    Args:
+        line (str): The whitespace normalized line.
+
+    Returns:
+        bool: Whether the line should be dropped.
+    """
+    if PAGE_NUMBER_RE.match(line):
+        return True
+
+    if any(pattern.search(line) for pattern in NOISE_PATTERNS):
+        return True
+
+    nrof_alnum_chars = sum(char.isalnum() for char in line)
+    return (
+        nrof_alnum_chars < MIN_ALNUM_CHARS
+        or nrof_alnum_chars / len(line) < MIN_ALNUM_RATIO
+    )
+
+
+def strip_page_noise(contents: dict[int, str]) -> tuple[dict[int, str], int]:
+    """
+    Strip the lines repeated across most pages, such as the disclaimer blocks and
+    running titles, page numbers, watermarks and low information fragments, with
+    whitespace normalized.
+
+    Args:
+        contents (dict[int, str]): The text of each page.
+
+    Returns:
+        tuple[dict[int, str], int]:
+            The cleaned text of each page and the number of dropped lines.
+    """
+    page_lines = {
+        page_number: [line for line in map(normalize_line, content.split("\n")) if line]
+        for page_number, content in contents.items()
+    }
+
+    # page numbers inside running titles differ per page, compare them digit-less
+    repeated_lines = set()
+    if len(page_lines) >= MIN_PAGES_FOR_REPETITION:
+        line_page_counts = Counter(
+            key
+            for lines in page_lines.values()
+            for key in {DIGITS_RE.sub("#", line) for line in lines}
+        )
+        min_repeated_pages = max(
+            MIN_PAGES_FOR_REPETITION,
+            math.ceil(len(page_lines) * REPEATED_PAGE_RATIO),
+        )
+        repeated_lines = {
+            key
+            for key, count in line_page_counts.items()
+            if count >= min_repeated_pages
+        }
+
+    cleaned_contents = {}
+    dropped_lines = 0
+    for page_number, lines in page_lines.items():
+        kept_lines = [
+            line
+            for line in lines
+            if DIGITS_RE.sub("#", line) not in repeated_lines
+            and not is_low_information_line(line)
+        ]
+        dropped_lines += len(lines) - len(kept_lines)
+        cleaned_contents[page_number] = "\n".join(kept_lines)
+
+    return cleaned_contents, dropped_lines
+
+
+def preprocess_pages(
+    contents: dict[int, str], uri_path: str
+) -> tuple[dict[int, str], PreprocessingReport]:
+    """
+    Strip the noise of the extracted PDF pages before summarization.
+
+    Args:
+        contents (dict[int, str]): The extracted text of each page.
+        uri_path (str): The document URI, used for reporting.
+
+    Returns:
+        tuple[dict[int, str], PreprocessingReport]:
+            The cleaned text of each page and the preprocessing report.
+    """
+    cleaned_contents, dropped_lines = strip_page_noise(contents)
+
+    model = get_settings().summarization_model
+    report = PreprocessingReport(
+        uri_path=uri_path,
+        input_tokens_before=token_counter(
+            model=model, text="\n".join(contents.values())
+        ),
+        input_tokens_after=token_counter(
+            model=model, text="\n".join(cleaned_contents.values())
+        ),
+        dropped_lines=dropped_lines,
+    )
+
+    return cleaned_contents, report
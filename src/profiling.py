@@ -0,0 +1,273 @@
+import asyncio
+import cProfile
+import io
+import json
+import pstats
+import re
+import time
+import tracemalloc
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+
+from pydantic import BaseModel
+
+ARTIFACT_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+EVENT_LOOP_LAG_INTERVAL = 0.1
+TRACEMALLOC_NROF_FRAMES = 25
+NROF_TOP_STATS = 50
+
+
+class ProfilingMode(str, Enum):
+    CPU = "cpu"
+    MEMORY = "memory"
+    EVENT_LOOP = "event_loop"
+
+
+class ProfilingStatus(BaseModel):
+    remaining_jobs: int
+    modes: list[ProfilingMode]
+    artifacts: list[str]
+
+
+class WorkerProfiling(BaseModel):
+    """
+    Profiling of the job work running outside of the event loop thread, passed to
+    the PDF split thread and the partition worker processes.
+    """
+
+    output_dir: str
+    prefix: str
+    modes: list[ProfilingMode]
+
+
+# set for the duration of a profiled job, read where work leaves the event loop
+WORKER_PROFILING: ContextVar[WorkerProfiling | None] = ContextVar(
+    "worker_profiling", default=None
+)
+
+
+def write_cpu_artifacts(
+    cpu_profiler: cProfile.Profile, output_dir: Path, prefix: str
+) -> None:
+    cpu_profiler.dump_stats(output_dir / f"{prefix}_cpu.prof")
+    stats_stream = io.StringIO()
+    pstats.Stats(cpu_profiler, stream=stats_stream).sort_stats(
+        pstats.SortKey.CUMULATIVE
+    ).print_stats(NROF_TOP_STATS)
+    (output_dir / f"{prefix}_cpu.txt").write_text(stats_stream.getvalue())
+
+
+def write_memory_artifacts(
+    start_snapshot: tracemalloc.Snapshot, output_dir: Path, prefix: str
+) -> None:
+    end_snapshot = tracemalloc.take_snapshot()
+    end_snapshot.dump(str(output_dir / f"{prefix}_memory.snapshot"))
+    top_stats = end_snapshot.compare_to(start_snapshot, "lineno")
+    (output_dir / f"{prefix}_memory.txt").write_text(
+        "\n".join(str(stat) for stat in top_stats[:NROF_TOP_STATS])
+    )
+
+
+@contextmanager
+def profile_worker(profiling: WorkerProfiling | None, name: str) -> Generator:
+    """
+    Profile the wrapped work of a profiled job running in a thread or worker
+    process, otherwise run it as is. cProfile only observes the thread it is
+    enabled in and tracemalloc the process it is started in, so this work is
+    missed by the job profile.
+
+    Memory is only traced when the process is not traced already, the job
+    profile covers the threads of the event loop process.
+
+    Args:
+        profiling (WorkerProfiling | None): The profiling of the job, if any.
+        name (str): The work identifier, used in the artifact names.
+    """
+    if profiling is None:
+        yield
+        return
+
+    output_dir = Path(profiling.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    prefix = f"{profiling.prefix}_{ARTIFACT_NAME_RE.sub('_', name)}"
+
+    cpu_profiler = None
+    if ProfilingMode.CPU in profiling.modes:
+        cpu_profiler = cProfile.Profile()
+        cpu_profiler.enable()
+
+    start_snapshot = None
+    if ProfilingMode.MEMORY in profiling.modes and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_NROF_FRAMES)
+        start_snapshot = tracemalloc.take_snapshot()
+
+    try:
+        yield
+    finally:
+        if cpu_profiler is not None:
+            cpu_profiler.disable()
+            write_cpu_artifacts(cpu_profiler, output_dir, prefix)
+
+        if start_snapshot is not None:
+            write_memory_artifacts(start_snapshot, output_dir, prefix)
+            tracemalloc.stop()
+
+
+class EventLoopLagMonitor:
+    """
+    Measure how late the event loop wakes up a task sleeping in a fixed interval,
+    which is the time spent by blocking code such as `partition_pdf`.
+    """
+
+    def __init__(self, interval: float = EVENT_LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.lags = []
+        self._task = None
+        self._last_wakeup_time = None
+
+    def _record_lag(self) -> None:
+        current_time = time.perf_counter()
+        self.lags.append(current_time - self._last_wakeup_time - self.interval)
+        self._last_wakeup_time = current_time
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self._record_lag()
+
+    def start(self) -> None:
+        # measured from now, so blocking before the task first runs is counted
+        self._last_wakeup_time = time.perf_counter()
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> dict:
+        self._task.cancel()
+        if time.perf_counter() - self._last_wakeup_time > self.interval:
+            self._record_lag()
+
+        if not self.lags:
+            return {"nrof_samples": 0}
+
+        return {
+            "nrof_samples": len(self.lags),
+            "interval": self.interval,
+            "mean_lag": sum(self.lags) / len(self.lags),
+            "max_lag": max(self.lags),
+            "total_lag": sum(self.lags),
+        }
+
+
+class JobProfiler:
+    """
+    Profile the next N processed jobs on demand and write the results as profile
+    artifacts into the output directory.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = Path(output_dir)
+        self.remaining_jobs = 0
+        self.modes = []
+        self._cpu_profiler_active = False
+        self._nrof_memory_profiled_jobs = 0
+
+    def arm(self, num_of_jobs: int, modes: list[ProfilingMode]) -> None:
+        self.remaining_jobs = num_of_jobs
+        self.modes = list(modes)
+
+    def status(self) -> ProfilingStatus:
+        return ProfilingStatus(
+            remaining_jobs=self.remaining_jobs,
+            modes=self.modes,
+            artifacts=self.list_artifacts(),
+        )
+
+    def list_artifacts(self) -> list[str]:
+        if not self.output_dir.is_dir():
+            return []
+
+        return sorted(path.name for path in self.output_dir.iterdir())
+
+    def get_artifact_path(self, artifact_name: str) -> Path | None:
+        if artifact_name not in self.list_artifacts():
+            return None
+
+        return self.output_dir / artifact_name
+
+    def _write_artifact(self, name: str, content: str) -> None:
+        (self.output_dir / name).write_text(content)
+
+    @asynccontextmanager
+    async def profile_job(self, job_name: str) -> AsyncGenerator:
+        """
+        Profile the wrapped job when profiling is armed, otherwise run it as is.
+
+        The CPU profile covers everything running on the event loop meanwhile, and
+        only one job is CPU profiled at a time since a single profiler can be
+        active per thread. The work leaving the event loop thread is profiled
+        where it runs, see `profile_worker`.
+
+        Args:
+            job_name (str): The job identifier, used in the artifact names.
+        """
+        if self.remaining_jobs <= 0:
+            yield
+            return
+
+        self.remaining_jobs -= 1
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        prefix = (
+            f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}_"
+            f"{ARTIFACT_NAME_RE.sub('_', job_name)}"
+        )
+
+        cpu_profiler = None
+        if ProfilingMode.CPU in self.modes and not self._cpu_profiler_active:
+            self._cpu_profiler_active = True
+            cpu_profiler = cProfile.Profile()
+            cpu_profiler.enable()
+
+        start_snapshot = None
+        if ProfilingMode.MEMORY in self.modes:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEMALLOC_NROF_FRAMES)
+            self._nrof_memory_profiled_jobs += 1
+            start_snapshot = tracemalloc.take_snapshot()
+
+        lag_monitor = None
+        if ProfilingMode.EVENT_LOOP in self.modes:
+            lag_monitor = EventLoopLagMonitor()
+            lag_monitor.start()
+
+        worker_profiling_token = WORKER_PROFILING.set(
+            WorkerProfiling(
+                output_dir=str(self.output_dir), prefix=prefix, modes=self.modes
+            )
+        )
+
+        try:
+            yield
+        finally:
+            WORKER_PROFILING.reset(worker_profiling_token)
+
+            if cpu_profiler is not None:
+                cpu_profiler.disable()
+                self._cpu_profiler_active = False
+                write_cpu_artifacts(cpu_profiler, self.output_dir, prefix)
+
+            if start_snapshot is not None:
+                write_memory_artifacts(start_snapshot, self.output_dir, prefix)
+                self._nrof_memory_profiled_jobs -= 1
+                if not self._nrof_memory_profiled_jobs:
+                    tracemalloc.stop()
+
+            if lag_monitor is not None:
+                self._write_artifact(
+                    f"{prefix}_event_loop.json",
+                    json.dumps(lag_monitor.stop(), indent=2),
+                )
+
+            print(f"written profile artifacts {prefix} to {self.output_dir}")
@@ -0,0 +1,164 @@
+import re
+from collections.abc import Callable
+from difflib import SequenceMatcher
+
+from pydantic import BaseModel
+
+# phrases which mark the page batches holding the 4 summarized informations and
+# their weight, phrases also repeated across the indictment and the witness
+# testimonies count less
+RELEVANT_KEYWORDS = {
+    "tuntutan": 1.0,
+    "menuntut": 1.0,
+    "menjatuhkan pidana": 1.0,
+    "pidana penjara": 0.5,
+    "denda": 0.25,
+    "memberatkan": 1.0,
+    "meringankan": 1.0,
+    "mengadili": 1.0,
+    "menolak permohonan kasasi": 1.0,
+    "mengabulkan permohonan kasasi": 1.0,
+    "amar putusan": 1.0,
+}
+WORD_RE = re.compile(r"\w+")
+
+# A batch router decides which model summarizes a page batch, given the batch
+# content and whether it is the first or last batch of the document. Returning
+# `None` skips the batch altogether.
+BatchRouter = Callable[[str, bool, bool], str | None]
+
+
+class RoutingReport(BaseModel):
+    decision_number: str
+    full_model_calls: int = 0
+    light_model_calls: int = 0
+    skipped_calls: int = 0
+
+    @property
+    def total_batches(self) -> int:
+        return self.full_model_calls + self.light_model_calls + self.skipped_calls
+
+    @property
+    def calls_saved(self) -> int:
+        return self.skipped_calls
+
+    def record(self, model: str | None, full_model: str) -> None:
+        if model is None:
+            self.skipped_calls += 1
+        elif model == full_model:
+            self.full_model_calls += 1
+        else:
+            self.light_model_calls += 1
+
+    def __str__(self) -> str:
+        return (
+            f"routing report {self.decision_number}: {self.total_batches} batches, "
+            f"{self.full_model_calls} full model calls, "
+            f"{self.light_model_calls} light model calls, "
+            f"{self.calls_saved} calls saved"
+        )
+
+
+def full_pipeline_router(model: str) -> BatchRouter:
+    """
+    Create a router which sends every page batch to the given model.
+
+    Args:
+        model (str): The model used for every page batch.
+
+    Returns:
+        BatchRouter: The router.
+    """
+
+    def route(content: str, is_first_batch: bool, is_last_batch: bool) -> str | None:
+        return model
+
+    return route
+
+
+def keyword_density(
+    content: str, keywords: dict[str, float] = RELEVANT_KEYWORDS
+) -> float:
+    """
+    Count the weighted keyword occurrences per 1000 words of the content.
+
+    Args:
+        content (str): The page batch content.
+        keywords (dict[str, float]): The lowercased keywords to look for and
+            their weight.
+
+    Returns:
+        float: The weighted number of keyword occurrences per 1000 words.
+    """
+    nrof_words = len(WORD_RE.findall(content))
+    if not nrof_words:
+        return 0.0
+
+    lowered_content = content.lower()
+    nrof_hits = sum(
+        lowered_content.count(keyword) * weight for keyword, weight in keywords.items()
+    )
+
+    return nrof_hits * 1000 / nrof_words
+
+
+def keyword_density_router(
+    model: str,
+    light_model: str | None = None,
+    full_model_min_density: float = 2.0,
+    light_model_min_density: float = 0.5,
+) -> BatchRouter:
+    """
+    Create a router which picks the model based on the keyword density of the page
+    batch. The first and last batches, which hold the defendant details and the
+    final verdict, always go to the full model.
+
+    Args:
+        model (str): The model for the relevant page batches.
+        light_model (str | None):
+            The cheaper model for the page batches with few keywords, these batches
+            are skipped when it is not set.
+        full_model_min_density (float):
+            The minimum keyword density to use the full model.
+        light_model_min_density (float):
+            The minimum keyword density to use the light model, batches below it
+            are skipped.
+
+    Returns:
+        BatchRouter: The router.
+    """
+
+    def route(content: str, is_first_batch: bool, is_last_batch: bool) -> str | None:
+        if is_first_batch or is_last_batch:
+            return model
+
+        density = keyword_density(content)
+        if density >= full_model_min_density:
+            return model
+
+        if light_model is not None and density >= light_model_min_density:
+            return light_model
+
+        return None
+
+    return route
+
+
+def compare_summary_sections(
+    baseline_sections: dict[str, str], routed_sections: dict[str, str]
+) -> dict[str, float]:
+    """
+    Compare the summary sections generated with routing against the full pipeline
+    baseline.
+
+    Args:
+        baseline_sections (dict[str, str]): The full pipeline summary sections.
+        routed_sections (dict[str, str]): The routed pipeline summary sections.
+
+    Returns:
+        dict[str, float]: The similarity ratio between 0 and 1 of each section.
+    """
+    return {
+        key: SequenceMatcher(None, content, routed_sections.get(key, "")).ratio()
+        for key, content in baseline_sections.items()
+    }
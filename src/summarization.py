@@ -1,9 +1,18 @@
+import re
+from collections.abc import Iterator
+from html import unescape
+from xml.etree.ElementTree import Element
+
 import markdown
 from bs4 import BeautifulSoup
+from markdown.util import AMP_SUBSTITUTE
 from sqlalchemy.engine.base import Engine
 
 from src.io import get_extraction_db_data_and_validate, read_pdf_from_uri
-from src.module import generate_court_decision_summary_and_translation
+from src.module import (
+    build_section_translation_cache,
+    generate_court_decision_summary_and_translation,
+)
 
 
 async def extract_and_reformat_summary(
@@ -20,11 +29,114 @@ async def extract_and_reformat_summary(
         decision_number=case_meta.decision_number,
         doc_content=doc_content,
         max_page=max_page,
+        cached_translations=build_section_translation_cache(
+            summary=case_meta.summary_formatted,
+            translated_summary=case_meta.summary_formatted_en,
+        ),
     )
     return summary, translated_summary, case_meta.decision_number
 
 
+MARKDOWN_RENDERER = markdown.Markdown()
+# only entity-like references are left unescaped by the markdown HTML serializer
+ENTITY_RE = re.compile(r"&(?:#[0-9]+|#x[0-9a-f]+|[0-9a-z]+);", re.IGNORECASE)
+ASCII_SPACES = " \n\t\x0c\r"
+PRESERVE_WHITESPACE_TAGS = {"pre", "textarea"}
+
+
+def iter_element_text_nodes(
+    element: Element, preserve_whitespace: bool = False
+) -> Iterator[tuple[str, bool]]:
+    """
+    Iterate the text nodes of an element in document order.
+
+    Args:
+        element (Element): The rendered markdown element.
+        preserve_whitespace (bool): Whether the element is inside a tag which
+            preserves whitespace.
+
+    Yields:
+        tuple[str, bool]: The text node and whether its whitespace is preserved.
+    """
+    if not isinstance(element.tag, str):
+        # comments and processing instructions are not part of the text
+        return
+
+    inner_preserve_whitespace = (
+        preserve_whitespace or element.tag in PRESERVE_WHITESPACE_TAGS
+    )
+    if element.text:
+        yield element.text, inner_preserve_whitespace
+
+    for child in element:
+        yield from iter_element_text_nodes(child, inner_preserve_whitespace)
+        if child.tail:
+            yield child.tail, inner_preserve_whitespace
+
+
+def normalize_text_node(text: str, preserve_whitespace: bool) -> str:
+    """
+    Decode a text node the same way `BeautifulSoup` does with `html.parser`.
+    """
+    text = ENTITY_RE.sub(
+        lambda match: unescape(match.group()), text.replace(AMP_SUBSTITUTE, "&")
+    )
+    if preserve_whitespace or text.strip(ASCII_SPACES):
+        return text
+
+    return "\n" if "\n" in text else " "
+
+
 def sanitize_markdown_symbol(content: str) -> str:
-    html = markdown.markdown(content)
-    soup = BeautifulSoup(html, "html.parser")
-    return soup.get_text()
+    """
+    Strip markdown symbols from the content and return the plain text.
+
+    The rendered markdown element tree is walked directly instead of being
+    serialized into HTML and parsed back by `BeautifulSoup`, the HTML round trip
+    is only kept for content with raw HTML since it is spliced in after
+    serialization.
+
+    Args:
+        content (str): The markdown formatted content.
+
+    Returns:
+        str: The plain text content.
+    """
+    if not content.strip():
+        return ""
+
+    renderer = MARKDOWN_RENDERER.reset()
+    lines = content.split("\n")
+    for preprocessor in renderer.preprocessors:
+        lines = preprocessor.run(lines)
+
+    root = renderer.parser.parseDocument(lines).getroot()
+    for treeprocessor in renderer.treeprocessors:
+        new_root = treeprocessor.run(root)
+        if new_root is not None:
+            root = new_root
+
+    if renderer.htmlStash.html_counter:
+        html = renderer.reset().convert(content)
+        soup = BeautifulSoup(html, "html.parser")
+        return soup.get_text()
+
+    # the serialized document is stripped right after the root tag is removed
+    children = list(root)
+    if not children:
+        text = (root.text or "").strip()
+        return normalize_text_node(text, False) if text else ""
+
+    text_nodes = [((root.text or "").lstrip(), False)]
+    for index, child in enumerate(children):
+        text_nodes.extend(iter_element_text_nodes(child))
+        tail = child.tail or ""
+        text_nodes.append(
+            (tail.rstrip() if index == len(children) - 1 else tail, False)
+        )
+
+    return "".join(
+        normalize_text_node(text, preserve_whitespace)
+        for text, preserve_whitespace in text_nodes
+        if text
+    )
@@ -0,0 +1,74 @@
+from pydantic import BaseModel
+
+
+class LLMCallUsage(BaseModel):
+    model: str
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+
+    @classmethod
+    def from_response(cls, response, model: str, latency: float) -> "LLMCallUsage":
+        """
+        Read the token usage reported in an LLM completion response.
+
+        Args:
+            response: The completion response.
+            model (str): The model which generated the response.
+            latency (float): The seconds taken until the response was complete.
+
+        Returns:
+            LLMCallUsage: The token usage of the call.
+        """
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return cls(model=model, latency=latency)
+
+        prompt_tokens_details = getattr(usage, "prompt_tokens_details", None)
+        return cls(
+            model=model,
+            prompt_tokens=usage.prompt_tokens or 0,
+            cached_tokens=getattr(prompt_tokens_details, "cached_tokens", None) or 0,
+            completion_tokens=usage.completion_tokens or 0,
+            latency=latency,
+        )
+
+
+class UsageReport(BaseModel):
+    decision_number: str
+    calls: list[LLMCallUsage] = []
+    # the calls overlap, so the document wall-clock time is measured separately
+    wall_time: float = 0.0
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(call.prompt_tokens for call in self.calls)
+
+    @property
+    def cached_tokens(self) -> int:
+        return sum(call.cached_tokens for call in self.calls)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(call.completion_tokens for call in self.calls)
+
+    @property
+    def summed_call_latency(self) -> float:
+        return sum(call.latency for call in self.calls)
+
+    def record(self, call: LLMCallUsage) -> None:
+        self.calls.append(call)
+
+    def __str__(self) -> str:
+        cached_ratio = (
+            self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+        )
+        return (
+            f"usage report {self.decision_number}: {len(self.calls)} calls, "
+            f"{self.prompt_tokens} prompt tokens "
+            f"({self.cached_tokens} cached, {cached_ratio:.1%}), "
+            f"{self.completion_tokens} completion tokens, "
+            f"{self.wall_time:.1f}s wall-clock time, "
+            f"{self.summed_call_latency:.1f}s summed call latency"
+        )
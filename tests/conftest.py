@@ -0,0 +1,7 @@
+import os
+
+# `Settings` requires these, the tests never reach the real services
+for key in ("OPENAI_API_KEY", "DB_ADDR", "DB_USER", "DB_PASS", "NATS__URL"):
+    os.environ.setdefault(key, "test")
+# use the bundled model cost map instead of fetching it on import
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
@@ -0,0 +1,173 @@
+import json
+import time
+import uuid
+from collections.abc import Callable
+
+from fastapi import FastAPI, Form, HTTPException, UploadFile
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+# A responder answers a batch request body with the response message content
+BatchResponder = Callable[[dict], str]
+
+
+class CreateBatchRequest(BaseModel):
+    input_file_id: str
+    endpoint: str
+    completion_window: str
+
+
+class FakeBatchServer:
+    """
+    Minimal stand-in of the OpenAI `/v1/files` and `/v1/batches` endpoints. Batches
+    are answered by the responder when created and report `in_progress` on their
+    first retrieval, the custom ids in `failures` fail as many times as set and
+    the endpoints in `endpoint_failures` answer with an error as many times as set.
+    """
+
+    def __init__(self, responder: BatchResponder):
+        self.responder = responder
+        self.failures: dict[str, int] = {}
+        self.endpoint_failures: dict[str, int] = {}
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+        self.completed_batches: dict[str, dict] = {}
+        self.submitted_custom_ids: list[list[str]] = []
+        self.app = self.create_app()
+
+    def create_file(self, content: bytes, filename: str, purpose: str) -> dict:
+        file_id = f"file-{uuid.uuid4().hex}"
+        self.files[file_id] = content
+
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+
+    def answer(self, request: dict) -> dict:
+        custom_id = request["custom_id"]
+        if self.failures.get(custom_id, 0) > 0:
+            self.failures[custom_id] -= 1
+            return {
+                "id": f"batch_req_{uuid.uuid4().hex}",
+                "custom_id": custom_id,
+                "response": {"status_code": 500, "body": {}},
+                "error": {"code": "server_error", "message": "injected failure"},
+            }
+
+        return {
+            "id": f"batch_req_{uuid.uuid4().hex}",
+            "custom_id": custom_id,
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "object": "chat.completion",
+                    "model": request["body"]["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": self.responder(request["body"]),
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                },
+            },
+            "error": None,
+        }
+
+    def create_batch(self, batch_request: CreateBatchRequest) -> dict:
+        if batch_request.input_file_id not in self.files:
+            raise HTTPException(status_code=404, detail="input file not found")
+
+        requests = [
+            json.loads(line)
+            for line in self.files[batch_request.input_file_id].decode().splitlines()
+            if line.strip()
+        ]
+        self.submitted_custom_ids.append([request["custom_id"] for request in requests])
+
+        answers = [self.answer(request) for request in requests]
+        outputs = [answer for answer in answers if answer["error"] is None]
+        errors = [answer for answer in answers if answer["error"] is not None]
+
+        def create_output_file(lines: list[dict]) -> str | None:
+            if not lines:
+                return None
+
+            content = "\n".join(json.dumps(line) for line in lines).encode()
+            return self.create_file(content, "output.jsonl", "batch_output")["id"]
+
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        self.batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": batch_request.endpoint,
+            "completion_window": batch_request.completion_window,
+            "input_file_id": batch_request.input_file_id,
+            "created_at": int(time.time()),
+            "status": "in_progress",
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {"total": len(requests), "completed": 0, "failed": 0},
+        }
+        self.completed_batches[batch_id] = {
+            **self.batches[batch_id],
+            "status": "completed",
+            "output_file_id": create_output_file(outputs),
+            "error_file_id": create_output_file(errors),
+            "request_counts": {
+                "total": len(requests),
+                "completed": len(outputs),
+                "failed": len(errors),
+            },
+        }
+
+        return self.batches[batch_id]
+
+    def retrieve_batch(self, batch_id: str) -> dict:
+        if batch_id not in self.batches:
+            raise HTTPException(status_code=404, detail="batch not found")
+
+        batch = self.batches[batch_id]
+        self.batches[batch_id] = self.completed_batches[batch_id]
+
+        return batch
+
+    def check_endpoint_failure(self, endpoint: str) -> None:
+        if self.endpoint_failures.get(endpoint, 0) > 0:
+            self.endpoint_failures[endpoint] -= 1
+            raise HTTPException(status_code=400, detail="injected failure")
+
+    def create_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/v1/files")
+        async def create_file(file: UploadFile, purpose: str = Form(...)):
+            return self.create_file(await file.read(), file.filename, purpose)
+
+        @app.get("/v1/files/{file_id}/content", response_class=PlainTextResponse)
+        async def get_file_content(file_id: str):
+            if file_id not in self.files:
+                raise HTTPException(status_code=404, detail="file not found")
+
+            return self.files[file_id].decode()
+
+        @app.post("/v1/batches")
+        async def create_batch(batch_request: CreateBatchRequest):
+            self.check_endpoint_failure("create_batch")
+            return self.create_batch(batch_request)
+
+        @app.get("/v1/batches/{batch_id}")
+        async def retrieve_batch(batch_id: str):
+            self.check_endpoint_failure("retrieve_batch")
+            return self.retrieve_batch(batch_id)
+
+        return app
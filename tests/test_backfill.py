@@ -0,0 +1,224 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from tenacity import wait_none
+
+from settings import get_settings
+from src import backfill
+from src.backfill import BackfillReport, BatchClient, run_summary_backfill
+from src.module import SUMMARY_SECTION_TITLES
+from tests.fake_batch_server import FakeBatchServer
+
+DOCUMENTS = {
+    "extraction-a": ("1 K/Pid/2024", 15),
+    "extraction-b": ("2 K/Pid/2024", 3),
+    "extraction-c": ("3 K/Pid/2024", 3),
+}
+NROF_SECTIONS = len(SUMMARY_SECTION_TITLES)
+
+
+def respond(body: dict) -> str:
+    content = body["messages"][-1]["content"]
+    if "response_format" not in body:
+        return f"EN {content.split('---')[-1].strip()}"
+
+    # the page batch content closes the summarization prompt
+    last_page = content.strip().splitlines()[-1]
+    return json.dumps(
+        {
+            "current_page_context": last_page,
+            **{key: f"{key} sampai {last_page}" for key in SUMMARY_SECTION_TITLES},
+        }
+    )
+
+
+@pytest.fixture
+def written_summaries(monkeypatch) -> dict[str, dict]:
+    written_summaries = {}
+
+    async def get_extraction_db_data_and_validate(
+        extraction_id, crawler_db_engine, case_db_engine
+    ):
+        if extraction_id not in DOCUMENTS:
+            raise ValueError(f"extraction {extraction_id} not found")
+
+        decision_number, _ = DOCUMENTS[extraction_id]
+        return (
+            SimpleNamespace(artifact_link=extraction_id),
+            SimpleNamespace(
+                decision_number=decision_number,
+                summary_formatted=None,
+                summary_formatted_en=None,
+            ),
+        )
+
+    async def read_pdf_from_uri(uri_path):
+        _, max_page = DOCUMENTS[uri_path]
+        return {
+            page_number: f"{uri_path} halaman {page_number}"
+            for page_number in range(1, max_page + 1)
+        }, max_page
+
+    async def write_summary_to_db(case_db_engine, decision_number, **summaries):
+        written_summaries[decision_number] = summaries
+
+    monkeypatch.setattr(
+        backfill,
+        "get_extraction_db_data_and_validate",
+        get_extraction_db_data_and_validate,
+    )
+    monkeypatch.setattr(backfill, "read_pdf_from_uri", read_pdf_from_uri)
+    monkeypatch.setattr(backfill, "write_summary_to_db", write_summary_to_db)
+    for method in (BatchClient.submit, BatchClient.retrieve_batch):
+        monkeypatch.setattr(method.retry, "wait", wait_none())
+
+    return written_summaries
+
+
+def run_backfill(server: FakeBatchServer, extraction_ids: list[str]) -> list[str]:
+    async def run() -> list[str]:
+        async with AsyncClient(transport=ASGITransport(app=server.app)) as client:
+            batch_client = BatchClient(http_client=client)
+            batch_client.poll_interval = 0
+
+            report = await run_summary_backfill(
+                extraction_ids=extraction_ids,
+                crawler_db_engine=None,
+                case_db_engine=None,
+                batch_client=batch_client,
+            )
+            return report.failed_extraction_ids
+
+    return asyncio.run(run())
+
+
+def count_submissions(server: FakeBatchServer, custom_id: str) -> int:
+    return sum(custom_id in custom_ids for custom_ids in server.submitted_custom_ids)
+
+
+def translation_custom_ids(extraction_id: str) -> list[str]:
+    return [f"translation-{extraction_id}-{key}" for key in SUMMARY_SECTION_TITLES]
+
+
+def test_run_summary_backfill_through_the_batch_api(written_summaries):
+    server = FakeBatchServer(respond)
+
+    failed_extraction_ids = run_backfill(
+        server, ["extraction-a", "extraction-missing", "extraction-b"]
+    )
+
+    assert failed_extraction_ids == ["extraction-missing"]
+    assert server.submitted_custom_ids == [
+        ["summary-extraction-a-0", "summary-extraction-b-0"],
+        ["summary-extraction-a-1", *translation_custom_ids("extraction-b")],
+        translation_custom_ids("extraction-a"),
+    ]
+
+    summary = written_summaries["1 K/Pid/2024"]
+    assert (
+        "## Identitas Terdakwa\n\ndefendant sampai extraction-a halaman 15"
+        in summary["summary"]
+    )
+    assert (
+        "## Defendant Details\n\nEN defendant sampai extraction-a halaman 15"
+        in summary["translated_summary"]
+    )
+    assert "##" not in summary["summary_text"]
+    assert (
+        "verdict sampai extraction-b halaman 3"
+        in written_summaries["2 K/Pid/2024"]["summary"]
+    )
+
+
+def test_run_summary_backfill_refills_finished_documents(
+    written_summaries, monkeypatch
+):
+    monkeypatch.setattr(get_settings(), "batch__max_active_documents", 2)
+    server = FakeBatchServer(respond)
+
+    failed_extraction_ids = run_backfill(
+        server, ["extraction-a", "extraction-b", "extraction-c"]
+    )
+
+    # the third document starts as soon as the second one is written, while the
+    # longer first document is still in progress
+    assert failed_extraction_ids == []
+    assert server.submitted_custom_ids == [
+        ["summary-extraction-a-0", "summary-extraction-b-0"],
+        ["summary-extraction-a-1", *translation_custom_ids("extraction-b")],
+        [*translation_custom_ids("extraction-a"), "summary-extraction-c-0"],
+        translation_custom_ids("extraction-c"),
+    ]
+    assert len(written_summaries) == 3
+
+
+def test_run_summary_backfill_resubmits_failed_requests(written_summaries):
+    server = FakeBatchServer(respond)
+    server.failures = {
+        "summary-extraction-a-1": 1,
+        "translation-extraction-b-verdict": 2,
+    }
+
+    failed_extraction_ids = run_backfill(server, ["extraction-a", "extraction-b"])
+
+    assert failed_extraction_ids == []
+    assert count_submissions(server, "summary-extraction-a-1") == 2
+    assert count_submissions(server, "translation-extraction-b-verdict") == 3
+    assert count_submissions(server, "translation-extraction-a-verdict") == 1
+    assert (
+        "EN verdict sampai extraction-b halaman 3"
+        in written_summaries["2 K/Pid/2024"]["translated_summary"]
+    )
+
+
+def test_run_summary_backfill_gives_up_after_max_retries(written_summaries):
+    server = FakeBatchServer(respond)
+    server.failures = {"summary-extraction-b-0": 100}
+
+    failed_extraction_ids = run_backfill(server, ["extraction-a", "extraction-b"])
+
+    assert failed_extraction_ids == ["extraction-b"]
+    assert (
+        count_submissions(server, "summary-extraction-b-0")
+        == get_settings().batch__max_retries + 1
+    )
+    assert list(written_summaries) == ["1 K/Pid/2024"]
+
+
+def test_run_summary_backfill_retries_batch_polling(written_summaries):
+    server = FakeBatchServer(respond)
+    server.endpoint_failures = {"retrieve_batch": 2}
+
+    failed_extraction_ids = run_backfill(server, ["extraction-b"])
+
+    assert failed_extraction_ids == []
+    assert server.endpoint_failures["retrieve_batch"] == 0
+    assert list(written_summaries) == ["2 K/Pid/2024"]
+
+
+def test_run_summary_backfill_survives_a_failed_round(written_summaries):
+    server = FakeBatchServer(respond)
+    # more failures than the submit retries, the whole first round fails
+    server.endpoint_failures = {"create_batch": 5}
+
+    failed_extraction_ids = run_backfill(server, ["extraction-a", "extraction-b"])
+
+    assert failed_extraction_ids == []
+    assert server.submitted_custom_ids[0] == [
+        "summary-extraction-a-0",
+        "summary-extraction-b-0",
+    ]
+    assert len(written_summaries) == 2
+
+
+def test_backfill_report_counts_unfinished_documents_as_failed():
+    report = BackfillReport(
+        extraction_ids=["extraction-a", "extraction-b", "extraction-c"],
+        succeeded_extraction_ids=["extraction-b"],
+    )
+
+    assert report.failed_extraction_ids == ["extraction-a", "extraction-c"]
+    assert "1 documents backfilled, 2 failed" in str(report)
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from src import module
+from src.module import (
+    SUMMARIZATION_PROMPT,
+    SUMMARY_SECTION_TITLES,
+    SUMMARY_SECTION_TITLES_EN,
+    build_section_translation_cache,
+    build_summarization_messages,
+    format_summary_sections,
+    generate_sections_translation,
+    split_cached_translations,
+    split_summary_sections,
+)
+
+
+def test_summarization_messages_share_the_static_prefix():
+    first_messages = build_summarization_messages("-", "-", "page 1")
+    second_messages = build_summarization_messages("summary", "context", "page 11")
+    static_prefix = SUMMARIZATION_PROMPT.split("{current_summary}")[0]
+
+    assert first_messages[0] == second_messages[0]
+    assert first_messages[1]["content"].startswith(static_prefix)
+    assert second_messages[1]["content"].startswith(static_prefix)
+
+
+SECTIONS = {
+    "defendant": "- **Nama lengkap**: Terdakwa A\n- **Umur**: 38 tahun",
+    "prosecutor_demand": "1. Pidana penjara selama 9 tahun.\n2. Denda Rp1.000.000,00.",
+    "aggravating_mitigating": "Hal yang memberatkan:\n\n- Meresahkan masyarakat.",
+    "verdict": "> Menolak permohonan kasasi.\n\n---\n\nBiaya perkara Rp2.500,00.",
+}
+TRANSLATED_SECTIONS = {
+    "defendant": "- **Full name**: Defendant A\n- **Age**: 38 years",
+    "prosecutor_demand": "1. Imprisonment for 9 years.\n2. Fine of Rp1,000,000.00.",
+    "aggravating_mitigating": "Aggravating circumstances:\n\n- Disturbing society.",
+    "verdict": "> Rejecting the cassation appeal.\n\n---\n\nCourt fee Rp2,500.00.",
+}
+
+
+@pytest.mark.parametrize(
+    ("sections", "section_titles"),
+    [
+        (SECTIONS, SUMMARY_SECTION_TITLES),
+        (TRANSLATED_SECTIONS, SUMMARY_SECTION_TITLES_EN),
+    ],
+)
+def test_formatted_summary_splits_back_into_its_sections(sections, section_titles):
+    summary = format_summary_sections(sections, section_titles)
+
+    assert split_summary_sections(summary, section_titles) == sections
+
+
+def test_translation_cache_maps_stored_sections_to_their_translation():
+    cached_translations = build_section_translation_cache(
+        summary=format_summary_sections(SECTIONS, SUMMARY_SECTION_TITLES),
+        translated_summary=format_summary_sections(
+            TRANSLATED_SECTIONS, SUMMARY_SECTION_TITLES_EN
+        ),
+    )
+
+    assert cached_translations == {
+        SECTIONS[key]: TRANSLATED_SECTIONS[key] for key in SECTIONS
+    }
+
+
+def test_only_changed_sections_are_translated(monkeypatch):
+    cached_translations = build_section_translation_cache(
+        summary=format_summary_sections(SECTIONS, SUMMARY_SECTION_TITLES),
+        translated_summary=format_summary_sections(
+            TRANSLATED_SECTIONS, SUMMARY_SECTION_TITLES_EN
+        ),
+    )
+    changed_sections = {**SECTIONS, "verdict": "Mengabulkan permohonan kasasi."}
+    translated_contents = []
+
+    async def generate_translation(content, usage_report=None):
+        translated_contents.append(content)
+        return "Granting the cassation appeal."
+
+    monkeypatch.setattr(module, "generate_translation", generate_translation)
+    translated_sections = asyncio.run(
+        generate_sections_translation(changed_sections, cached_translations)
+    )
+
+    assert translated_contents == ["Mengabulkan permohonan kasasi."]
+    assert translated_sections == {
+        **TRANSLATED_SECTIONS,
+        "verdict": "Granting the cassation appeal.",
+    }
+
+
+def test_empty_sections_skip_translation():
+    sections = {
+        "defendant": "-",
+        "prosecutor_demand": "",
+        "aggravating_mitigating": " - ",
+        "verdict": "Menolak permohonan kasasi.",
+    }
+
+    translated_sections, pending_keys = split_cached_translations(
+        sections=sections, cached_translations={}
+    )
+
+    assert translated_sections == {
+        "defendant": "-",
+        "prosecutor_demand": "",
+        "aggravating_mitigating": "-",
+    }
+    assert pending_keys == ["verdict"]
+
+
+@pytest.mark.parametrize(
+    ("summary", "translated_summary"),
+    [
+        (
+            "Terdakwa A dijatuhi pidana penjara 9 tahun.",
+            "Defendant A was sentenced to 9 years.",
+        ),
+        ("# Ringkasan\n\nTerdakwa A.", "# Summary\n\nDefendant A."),
+        (None, None),
+        ("", ""),
+    ],
+)
+def test_legacy_summaries_yield_an_empty_translation_cache(summary, translated_summary):
+    assert split_summary_sections(summary, SUMMARY_SECTION_TITLES) == {}
+    assert build_section_translation_cache(summary, translated_summary) == {}
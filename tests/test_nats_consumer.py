@@ -0,0 +1,198 @@
+import asyncio
+
+import nats.errors
+from nats.js.api import ConsumerConfig
+
+import nats_consumer
+
+CONSUMER_CONFIG = ConsumerConfig(filter_subject="jobs", durable_name="jobs")
+
+
+class FakeMessage:
+    def __init__(self, data: str, events: list[str]):
+        self.data = data
+        self.events = events
+
+    async def ack(self) -> None:
+        self.events.append(f"ack {self.data}")
+
+    async def nak(self) -> None:
+        self.events.append(f"nak {self.data}")
+
+
+class FakePullSubscription:
+    """
+    Pull subscription handing out one message per fetch, `on_fetch` runs before
+    the message is returned.
+    """
+
+    def __init__(self, events: list[str], on_fetch=None):
+        self.events = events
+        self.on_fetch = on_fetch
+        self.nrof_fetches = 0
+
+    async def fetch(self, batch: int = 1) -> list[FakeMessage]:
+        self.nrof_fetches += 1
+        await asyncio.sleep(0)
+        if self.on_fetch is not None:
+            self.on_fetch(self.nrof_fetches)
+
+        return [FakeMessage(f"job-{self.nrof_fetches}", self.events)]
+
+
+class FakeJetStream:
+    def __init__(self, subscription: FakePullSubscription):
+        self.subscription = subscription
+
+    async def pull_subscribe(self, **kwargs) -> FakePullSubscription:
+        return self.subscription
+
+
+class FakeNatsClient:
+    def __init__(self, events: list[str], is_reconnecting: bool = False):
+        self.events = events
+        self.is_closed = False
+        self.is_connecting = False
+        self.is_reconnecting = is_reconnecting
+
+    async def drain(self) -> None:
+        if self.is_reconnecting:
+            raise nats.errors.ConnectionReconnectingError
+
+        self.events.append("drain")
+        self.is_closed = True
+
+    async def close(self) -> None:
+        self.events.append("close")
+        self.is_closed = True
+
+
+def start_consumer(
+    subscription: FakePullSubscription, processing_func, shutdown_event
+) -> asyncio.Task:
+    return asyncio.create_task(
+        nats_consumer.run_job_consumer(
+            jetstream_client=FakeJetStream(subscription),
+            consumer_config=CONSUMER_CONFIG,
+            processing_func=processing_func,
+            shutdown_event=shutdown_event,
+            wait_time_for_next_fetch=0,
+        )
+    )
+
+
+def test_error_callback_does_not_delay_reconnect_attempts():
+    async def run_error_callback():
+        await asyncio.wait_for(
+            nats_consumer.error_callback(ConnectionRefusedError("nats down")),
+            timeout=1,
+        )
+
+    asyncio.run(run_error_callback())
+
+
+def test_consumer_stops_fetching_once_shutdown_is_set():
+    events = []
+
+    async def run():
+        shutdown_event = asyncio.Event()
+
+        async def process(msg):
+            await msg.ack()
+            if msg.data == "job-3":
+                shutdown_event.set()
+
+        subscription = FakePullSubscription(events)
+        await asyncio.wait_for(
+            start_consumer(subscription, process, shutdown_event), timeout=1
+        )
+
+        return subscription.nrof_fetches
+
+    assert asyncio.run(run()) == 3
+    assert events == ["ack job-1", "ack job-2", "ack job-3"]
+
+
+def test_consumer_naks_a_job_fetched_after_shutdown():
+    events = []
+
+    async def run():
+        shutdown_event = asyncio.Event()
+        processed_jobs = []
+
+        async def process(msg):
+            processed_jobs.append(msg.data)
+            await msg.ack()
+
+        def shut_down_during_second_fetch(nrof_fetches: int) -> None:
+            if nrof_fetches == 2:
+                shutdown_event.set()
+
+        subscription = FakePullSubscription(events, shut_down_during_second_fetch)
+        await asyncio.wait_for(
+            start_consumer(subscription, process, shutdown_event), timeout=1
+        )
+
+        return processed_jobs
+
+    assert asyncio.run(run()) == ["job-1"]
+    assert events == ["ack job-1", "nak job-2"]
+
+
+def test_close_acks_the_in_flight_job_before_draining():
+    events = []
+
+    async def run():
+        shutdown_event = asyncio.Event()
+        job_started = asyncio.Event()
+
+        async def process(msg):
+            job_started.set()
+            await asyncio.sleep(0.05)
+            await msg.ack()
+
+        consumer_task = start_consumer(
+            FakePullSubscription(events), process, shutdown_event
+        )
+        await job_started.wait()
+        await nats_consumer.close_nats_connection(
+            FakeNatsClient(events), [consumer_task], shutdown_event, timeout=1
+        )
+
+    asyncio.run(run())
+
+    assert events == ["ack job-1", "drain"]
+
+
+def test_close_cancels_stuck_jobs_and_closes_a_reconnecting_client():
+    events = []
+
+    async def run():
+        shutdown_event = asyncio.Event()
+        job_started = asyncio.Event()
+
+        async def process(msg):
+            job_started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                events.append(f"cancelled {msg.data}")
+                raise
+
+        consumer_task = start_consumer(
+            FakePullSubscription(events), process, shutdown_event
+        )
+        await job_started.wait()
+        await nats_consumer.close_nats_connection(
+            FakeNatsClient(events, is_reconnecting=True),
+            [consumer_task],
+            shutdown_event,
+            timeout=0.05,
+        )
+
+        return consumer_task
+
+    consumer_task = asyncio.run(run())
+
+    assert consumer_task.cancelled()
+    assert events == ["cancelled job-1", "close"]
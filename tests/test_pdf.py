@@ -0,0 +1,182 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+
+from settings import get_settings
+from src import pdf
+from src.pdf import (
+    PartitionStrategy,
+    get_partition_process_pool,
+    get_pdf_image_dpi,
+    partition_pdf_in_page_ranges,
+    probe_partition_strategy,
+    split_pdf_page_ranges,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+# the directory header and the running title, disclaimer and page number footer
+NROF_STAMP_HEADER_LINES = 2
+NROF_STAMP_FOOTER_LINES = 5
+
+
+def split_stamp_and_body(page_content: str) -> tuple[str, str]:
+    lines = page_content.split("\n")
+    stamp_lines = lines[:NROF_STAMP_HEADER_LINES] + lines[-NROF_STAMP_FOOTER_LINES:]
+    body_lines = lines[NROF_STAMP_HEADER_LINES:-NROF_STAMP_FOOTER_LINES]
+
+    return "\n".join(stamp_lines), "\n".join(body_lines)
+
+
+def create_pdf_reader(page_texts: list[str]) -> SimpleNamespace:
+    return SimpleNamespace(
+        pages=[
+            SimpleNamespace(extract_text=lambda text=text: text) for text in page_texts
+        ]
+    )
+
+
+@pytest.fixture
+def stamped_pages() -> list[tuple[str, str]]:
+    with open(FIXTURES_DIR / "putusan_pages.json") as fixture_file:
+        pages = json.load(fixture_file)
+
+    return [split_stamp_and_body(content) for content in pages.values()]
+
+
+def test_probe_ignores_the_directory_stamp_of_image_only_pages(stamped_pages):
+    stamps = [stamp for stamp, _ in stamped_pages]
+    assert all(
+        len(stamp) >= get_settings().ocr__text_layer_min_chars for stamp in stamps
+    )
+
+    strategy = probe_partition_strategy(create_pdf_reader(stamps))
+    single_page_strategy = probe_partition_strategy(create_pdf_reader(stamps[:1]))
+
+    assert strategy == PartitionStrategy.OCR_ONLY
+    assert single_page_strategy == PartitionStrategy.OCR_ONLY
+
+
+def test_probe_detects_text_layer_pages(stamped_pages):
+    full_pages = [f"{stamp}\n{body}" for stamp, body in stamped_pages[:4]]
+    stamps = [stamp for stamp, _ in stamped_pages]
+
+    strategy = probe_partition_strategy(create_pdf_reader(full_pages))
+    mixed_strategy = probe_partition_strategy(
+        create_pdf_reader(full_pages[:2] + stamps[2:])
+    )
+
+    assert strategy == PartitionStrategy.FAST
+    assert mixed_strategy == PartitionStrategy.AUTO
+
+
+def write_blank_pdf(path, nrof_pages: int) -> str:
+    pdf_writer = PdfWriter()
+    for _ in range(nrof_pages):
+        pdf_writer.add_blank_page(width=595, height=842)
+    with open(path, "wb") as pdf_file:
+        pdf_writer.write(pdf_file)
+
+    return str(path)
+
+
+def test_split_pdf_page_ranges_splits_scanned_documents(tmp_path):
+    filename = write_blank_pdf(tmp_path / "scanned.pdf", nrof_pages=12)
+    output_dir = tmp_path / "ranges"
+    output_dir.mkdir()
+
+    strategy, page_ranges = split_pdf_page_ranges(filename, str(output_dir))
+
+    pages_per_range = get_settings().ocr__pages_per_range
+    assert strategy == PartitionStrategy.OCR_ONLY
+    assert [start for _, start in page_ranges] == list(range(1, 13, pages_per_range))
+    assert sum(len(PdfReader(name).pages) for name, _ in page_ranges) == 12
+
+
+def test_split_pdf_page_ranges_keeps_text_documents_whole(tmp_path, monkeypatch):
+    filename = write_blank_pdf(tmp_path / "text.pdf", nrof_pages=12)
+    monkeypatch.setattr(
+        pdf, "probe_partition_strategy", lambda pdf_reader: PartitionStrategy.FAST
+    )
+
+    strategy, page_ranges = split_pdf_page_ranges(filename, str(tmp_path))
+
+    assert strategy == PartitionStrategy.FAST
+    assert page_ranges == [(filename, 1)]
+
+
+def test_scanned_documents_are_rendered_at_a_higher_dpi():
+    settings = get_settings()
+
+    assert get_pdf_image_dpi(PartitionStrategy.AUTO) == settings.ocr__pdf_image_dpi
+    assert (
+        get_pdf_image_dpi(PartitionStrategy.OCR_ONLY)
+        == settings.ocr__scanned_pdf_image_dpi
+    )
+    assert settings.ocr__scanned_pdf_image_dpi > settings.ocr__pdf_image_dpi
+
+
+def partition_blank_page_range(
+    filename: str,
+    starting_page_number: int,
+    strategy: PartitionStrategy,
+    pdf_image_dpi: int,
+    profiling=None,
+) -> list[tuple[int, str]]:
+    # the first range finishes last, the merged order must not depend on timing
+    if starting_page_number == 1:
+        time.sleep(0.2)
+
+    nrof_pages = len(PdfReader(filename).pages)
+    return [
+        (page_number, f"page {page_number}")
+        for page_number in range(
+            starting_page_number, starting_page_number + nrof_pages
+        )
+    ]
+
+
+def test_partition_pdf_in_page_ranges_merges_ranges_in_page_order(
+    tmp_path, monkeypatch
+):
+    filename = write_blank_pdf(tmp_path / "scanned.pdf", nrof_pages=12)
+    monkeypatch.setattr(pdf, "partition_pdf_page_range", partition_blank_page_range)
+
+    with ThreadPoolExecutor(max_workers=3) as thread_pool:
+        monkeypatch.setattr(pdf, "get_partition_process_pool", lambda: thread_pool)
+        elements = asyncio.run(partition_pdf_in_page_ranges(filename))
+
+    assert elements == [
+        (page_number, f"page {page_number}") for page_number in range(1, 13)
+    ]
+
+
+def test_partition_pdf_in_page_ranges_replaces_a_broken_process_pool(
+    tmp_path, monkeypatch
+):
+    filename = write_blank_pdf(tmp_path / "scanned.pdf", nrof_pages=6)
+    monkeypatch.setattr(get_settings(), "ocr__num_of_workers", 1)
+    get_partition_process_pool.cache_clear()
+
+    # a worker crash breaks the pool shared by every document
+    broken_process_pool = get_partition_process_pool()
+    with pytest.raises(BrokenProcessPool):
+        broken_process_pool.submit(os._exit, 1).result()
+
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(partition_pdf_in_page_ranges(filename))
+
+    process_pool = get_partition_process_pool()
+    try:
+        assert process_pool is not broken_process_pool
+        assert process_pool.submit(sum, [1, 2]).result() == 3
+    finally:
+        process_pool.shutdown()
+        get_partition_process_pool.cache_clear()
@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.preprocessing import is_low_information_line, preprocess_pages
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# the lines holding the 4 summarized informations, which must never be dropped
+SUMMARIZED_LINES = [
+    # defendant details
+    "Nama lengkap : BUDI SANTOSO alias BUDI bin SLAMET;",
+    "Umur/tanggal lahir : 38 tahun/12 Maret 1985;",
+    "Tempat tinggal : Jalan Merdeka Nomor 10, Kota Surabaya;",
+    "Pekerjaan : Wiraswasta;",
+    "Terdakwa berada dalam tahanan Rumah Tahanan Negara sejak tanggal 5 Januari 2023;",
+    # prosecutor's demand
+    "Membaca tuntutan pidana Penuntut Umum pada Kejaksaan Negeri Surabaya tanggal 2 "
+    "Mei 2023 sebagai berikut:",
+    "2. Menjatuhkan pidana terhadap Terdakwa dengan pidana penjara selama 9 "
+    "(sembilan) tahun dan denda sebesar Rp1.000.000.000,00 (satu miliar rupiah) "
+    "subsidair 6 (enam) bulan penjara;",
+    "3. Menyatakan barang bukti berupa 1 (satu) paket sabu seberat 5,2 gram "
+    "dirampas untuk dimusnahkan;",
+    # aggravating and mitigating circumstances
+    "Keadaan yang memberatkan:",
+    "- Perbuatan Terdakwa tidak mendukung program pemerintah dalam memberantas "
+    "peredaran gelap narkotika;",
+    "Keadaan yang meringankan:",
+    "- Terdakwa belum pernah dihukum;",
+    # verdict
+    "M E N G A D I L I :",
+    "Menolak permohonan kasasi dari Pemohon Kasasi/Terdakwa BUDI SANTOSO alias BUDI "
+    "bin SLAMET tersebut;",
+    "Membebankan kepada Terdakwa untuk membayar biaya perkara pada tingkat kasasi "
+    "sebesar Rp2.500,00 (dua ribu lima ratus rupiah);",
+    "Demikianlah diputuskan dalam rapat musyawarah Majelis Hakim pada hari Rabu "
+    "tanggal 14 Juni 2023 oleh Dr. Andi Wijaya, S.H., M.H., Hakim Agung yang "
+    "ditetapkan oleh Ketua Mahkamah Agung sebagai Ketua Majelis;",
+]
+
+
+@pytest.fixture
+def putusan_pages() -> dict[int, str]:
+    with open(FIXTURES_DIR / "putusan_pages.json") as fixture_file:
+        pages = json.load(fixture_file)
+
+    return {int(page_number): content for page_number, content in pages.items()}
+
+
+def test_preprocess_pages_keeps_the_summarized_lines(putusan_pages):
+    cleaned_pages, report = preprocess_pages(putusan_pages, uri_path="fixture.pdf")
+    cleaned_lines = {
+        line for content in cleaned_pages.values() for line in content.split("\n")
+    }
+
+    for line in SUMMARIZED_LINES:
+        assert line in cleaned_lines
+    assert report.input_tokens_after < report.input_tokens_before
+
+
+def test_preprocess_pages_drops_the_page_noise(putusan_pages):
+    cleaned_pages, report = preprocess_pages(putusan_pages, uri_path="fixture.pdf")
+    cleaned_content = "\n".join(cleaned_pages.values())
+
+    assert sorted(cleaned_pages) == sorted(putusan_pages)
+    assert "Direktori Putusan Mahkamah Agung" not in cleaned_content
+    assert "mahkamahagung.go.id" not in cleaned_content
+    assert "Disclaimer" not in cleaned_content
+    assert "Halaman 3 dari 5 hal." not in cleaned_content
+    assert "~ ' ," not in cleaned_content
+    assert report.dropped_lines > 0
+
+
+def test_preprocess_pages_keeps_short_documents_lines():
+    pages = {1: "Putusan Mahkamah Agung", 2: "Putusan Mahkamah Agung"}
+
+    cleaned_pages, _ = preprocess_pages(pages, uri_path="fixture.pdf")
+
+    assert cleaned_pages == pages
+
+
+@pytest.mark.parametrize(
+    ("line", "expected"),
+    [
+        ("12", True),
+        ("Halaman 3 dari 5", True),
+        ("hal. 4", True),
+        ("~ ' ,", True),
+        ("M E N G A D I L I :", False),
+        ("Agama : Islam;", False),
+        ("Menolak permohonan kasasi dari Terdakwa;", False),
+    ],
+)
+def test_is_low_information_line(line, expected):
+    assert is_low_information_line(line) == expected
@@ -0,0 +1,138 @@
+import asyncio
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pypdf import PdfWriter
+
+from src import pdf
+from src.profiling import (
+    WORKER_PROFILING,
+    JobProfiler,
+    ProfilingMode,
+    WorkerProfiling,
+    profile_worker,
+)
+
+
+async def run_job(profiler: JobProfiler, job_name: str) -> None:
+    async with profiler.profile_job(job_name):
+        sum(range(10000))
+        await asyncio.sleep(0)
+
+
+def test_profiler_only_profiles_the_armed_number_of_jobs(tmp_path):
+    profiler = JobProfiler(output_dir=str(tmp_path))
+    profiler.arm(num_of_jobs=2, modes=[ProfilingMode.EVENT_LOOP])
+
+    nrof_artifacts = []
+    for job_number in range(3):
+        asyncio.run(run_job(profiler, f"job-{job_number}"))
+        nrof_artifacts.append(len(profiler.list_artifacts()))
+
+    assert profiler.remaining_jobs == 0
+    assert nrof_artifacts == [1, 2, 2]
+    assert profiler.status().remaining_jobs == 0
+
+
+def test_profiler_runs_jobs_as_is_when_not_armed(tmp_path):
+    profiler = JobProfiler(output_dir=str(tmp_path / "profiles"))
+
+    asyncio.run(run_job(profiler, "job"))
+
+    assert profiler.list_artifacts() == []
+    assert WORKER_PROFILING.get() is None
+
+
+@pytest.mark.parametrize(
+    ("mode", "suffixes"),
+    [
+        (ProfilingMode.CPU, ["_cpu.prof", "_cpu.txt"]),
+        (ProfilingMode.MEMORY, ["_memory.snapshot", "_memory.txt"]),
+        (ProfilingMode.EVENT_LOOP, ["_event_loop.json"]),
+    ],
+)
+def test_profiler_writes_the_artifacts_of_each_mode(tmp_path, mode, suffixes):
+    profiler = JobProfiler(output_dir=str(tmp_path))
+    profiler.arm(num_of_jobs=1, modes=[mode])
+
+    asyncio.run(run_job(profiler, "1 K/Pid/2024"))
+
+    artifacts = profiler.list_artifacts()
+    assert len(artifacts) == len(suffixes)
+    for suffix in suffixes:
+        assert any(
+            artifact.endswith(f"_1_K_Pid_2024{suffix}") for artifact in artifacts
+        )
+    assert not tracemalloc.is_tracing()
+
+
+def test_get_artifact_path_only_serves_artifacts_of_the_output_dir(tmp_path):
+    output_dir = tmp_path / "profiles"
+    output_dir.mkdir()
+    (output_dir / "job_cpu.txt").write_text("stats")
+    (tmp_path / "secret.txt").write_text("secret")
+    profiler = JobProfiler(output_dir=str(output_dir))
+
+    assert profiler.get_artifact_path("job_cpu.txt") == output_dir / "job_cpu.txt"
+    assert profiler.get_artifact_path("../secret.txt") is None
+    assert profiler.get_artifact_path("secret.txt") is None
+    assert profiler.get_artifact_path("missing_cpu.txt") is None
+
+
+def test_profile_worker_writes_its_own_artifacts(tmp_path):
+    profiling = WorkerProfiling(
+        output_dir=str(tmp_path),
+        prefix="job",
+        modes=[ProfilingMode.CPU, ProfilingMode.MEMORY],
+    )
+
+    with profile_worker(profiling, "partition_pages_6"):
+        sum(range(10000))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "job_partition_pages_6_cpu.prof",
+        "job_partition_pages_6_cpu.txt",
+        "job_partition_pages_6_memory.snapshot",
+        "job_partition_pages_6_memory.txt",
+    ]
+    assert not tracemalloc.is_tracing()
+
+
+def test_profiled_job_passes_the_profiling_to_the_pdf_workers(tmp_path, monkeypatch):
+    filename = str(tmp_path / "scanned.pdf")
+    pdf_writer = PdfWriter()
+    for _ in range(6):
+        pdf_writer.add_blank_page(width=595, height=842)
+    with open(filename, "wb") as pdf_file:
+        pdf_writer.write(pdf_file)
+
+    received_profilings = []
+
+    def partition_pdf_page_range(
+        filename, starting_page_number, strategy, pdf_image_dpi, profiling=None
+    ):
+        received_profilings.append(profiling)
+        return [(starting_page_number, "page")]
+
+    monkeypatch.setattr(pdf, "partition_pdf_page_range", partition_pdf_page_range)
+    profiler = JobProfiler(output_dir=str(tmp_path / "profiles"))
+    profiler.arm(num_of_jobs=1, modes=[ProfilingMode.CPU])
+
+    async def run_profiled_job():
+        async with profiler.profile_job("job"):
+            await pdf.partition_pdf_in_page_ranges(filename)
+
+    with ThreadPoolExecutor(max_workers=2) as thread_pool:
+        monkeypatch.setattr(pdf, "get_partition_process_pool", lambda: thread_pool)
+        asyncio.run(run_profiled_job())
+
+    assert len(received_profilings) == 2
+    assert all(
+        profiling is not None and profiling.modes == [ProfilingMode.CPU]
+        for profiling in received_profilings
+    )
+    assert any(
+        artifact.endswith("_job_split_cpu.prof")
+        for artifact in profiler.list_artifacts()
+    )
@@ -0,0 +1,48 @@
+from src.routing import RoutingReport, keyword_density, keyword_density_router
+
+FILLER = " ".join(["saksi menerangkan bahwa kejadian tersebut benar"] * 50)
+DEMAND_BATCH = (
+    "Menimbang, bahwa Penuntut Umum mengajukan tuntutan yang pada pokoknya "
+    "menuntut supaya Majelis Hakim menjatuhkan pidana penjara selama 5 tahun. "
+    "Keadaan yang memberatkan: perbuatan terdakwa meresahkan masyarakat. "
+    "Keadaan yang meringankan: terdakwa bersikap sopan. " + FILLER
+)
+INDICTMENT_BATCH = (
+    "Penuntut Umum mendakwa terdakwa dengan ancaman pidana penjara dan denda "
+    "sebagaimana diatur dalam Pasal 114 ayat (1). Penuntut Umum menghadirkan "
+    "saksi-saksi. " + FILLER
+)
+
+
+def test_generic_phrases_weigh_less_than_the_demand_and_verdict_phrases():
+    assert keyword_density("penuntut umum " * 10) == 0.0
+    assert keyword_density(f"denda {FILLER}") < keyword_density(f"tuntutan {FILLER}")
+    assert keyword_density(f"pidana penjara {FILLER}") < keyword_density(
+        f"menjatuhkan pidana {FILLER}"
+    )
+
+
+def test_keyword_density_router_routes_by_weighted_density():
+    router = keyword_density_router(
+        model="full",
+        light_model="light",
+        full_model_min_density=10.0,
+        light_model_min_density=1.0,
+    )
+
+    assert router(DEMAND_BATCH, False, False) == "full"
+    assert router(INDICTMENT_BATCH, False, False) == "light"
+    assert router(FILLER, False, False) is None
+    assert router(FILLER, True, False) == "full"
+    assert router(FILLER, False, True) == "full"
+
+
+def test_routing_report_counts_the_routed_models():
+    report = RoutingReport(decision_number="1 K/Pid/2024")
+    for model in ("full", "light", None, "full"):
+        report.record(model, full_model="full")
+
+    assert report.full_model_calls == 2
+    assert report.light_model_calls == 1
+    assert report.calls_saved == 1
+    assert report.total_batches == 4
@@ -0,0 +1,29 @@
+from src.usage import LLMCallUsage, UsageReport
+
+
+def test_usage_report_keeps_wall_clock_time_apart_from_summed_call_latency():
+    report = UsageReport(decision_number="1 K/Pid/2024")
+    for _ in range(4):
+        report.record(
+            LLMCallUsage(
+                model="gpt-4o-mini",
+                prompt_tokens=2000,
+                cached_tokens=1024,
+                completion_tokens=300,
+                latency=3.0,
+            )
+        )
+    report.wall_time = 3.5
+
+    assert report.prompt_tokens == 8000
+    assert report.cached_tokens == 4096
+    assert report.summed_call_latency == 12.0
+    assert "3.5s wall-clock time" in str(report)
+    assert "12.0s summed call latency" in str(report)
+
+
+def test_usage_report_without_calls():
+    report = UsageReport(decision_number="1 K/Pid/2024")
+
+    assert "0 calls" in str(report)
+    assert report.summed_call_latency == 0